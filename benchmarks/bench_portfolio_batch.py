@@ -0,0 +1,62 @@
+# -------------------------------
+# PORTFOLIO BATCH BENCHMARK
+# -------------------------------
+# Times build_portfolios() for a monthly batch of synthetic users.
+#
+#   python benchmarks/bench_portfolio_batch.py --users 100000 500000 --repeat 5
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.tools.portfolio_builder import build_portfolios, portfolio_builder_tool  # noqa: E402
+
+
+def bench(n_users: int, repeat: int, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    savings = rng.uniform(0, 200_000, n_users)
+    ages = rng.integers(18, 75, n_users)
+    insured = rng.random(n_users) < 0.5
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build_portfolios(savings, ages, insured)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    return {
+        "users": n_users,
+        "best_ms": round(best * 1000, 3),
+        "median_ms": round(float(np.median(timings)) * 1000, 3),
+        "users_per_s": round(n_users / best)
+    }
+
+
+def bench_single_tool(calls: int) -> dict:
+    start = time.perf_counter()
+    for i in range(calls):
+        portfolio_builder_tool.invoke({"total_savings": 47000 + i, "user_age": 35, "insured": False})
+    elapsed = time.perf_counter() - start
+    return {"calls": calls, "per_call_us": round(elapsed / calls * 1e6, 2)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized portfolio builder")
+    parser.add_argument("--users", type=int, nargs="+", default=[1_000, 100_000, 500_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    results = {
+        "batch": [bench(n, args.repeat) for n in args.users],
+        "single_tool": bench_single_tool(1_000)
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
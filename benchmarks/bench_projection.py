@@ -0,0 +1,81 @@
+# -------------------------------
+# PROJECTION BENCHMARK
+# -------------------------------
+# Times the Monte Carlo projection for one user (the interactive case) and for a
+# batch of users sharing one simulation.
+#
+#   python benchmarks/bench_projection.py --paths 10000 --months 360 --users 1000 --repeat 3
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.tools.portfolio_projection import project_portfolios, simulate_unit_paths  # noqa: E402
+
+# Interactive budget for one user's projection
+SINGLE_USER_BUDGET_S = 1.0
+
+
+def _best(fn, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_single(paths: int, months: int, repeat: int) -> dict:
+    contributions = [22_495.91, 6_748.77, 4_998.64]
+    simulate = _best(lambda: simulate_unit_paths(months, paths, seed=1), repeat)
+    # seed=None always simulates; a fixed seed reuses the memoized unit paths after the first call
+    project = _best(lambda: project_portfolios(contributions, months, paths, seed=None), repeat)
+    warm = _best(lambda: project_portfolios(contributions, months, paths, seed=1), repeat + 1)[1:]
+    return {
+        "paths": paths,
+        "months": months,
+        "simulate_best_ms": round(min(simulate) * 1000, 3),
+        "project_best_ms": round(min(project) * 1000, 3),
+        "project_median_ms": round(float(np.median(project)) * 1000, 3),
+        "project_memoized_best_ms": round(min(warm) * 1000, 3),
+        "within_budget": min(project) < SINGLE_USER_BUDGET_S
+    }
+
+
+def bench_batch(users: int, paths: int, months: int, repeat: int, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    contributions = rng.uniform(1_000, 50_000, (users, 3))
+    # Horizon-only percentiles: the batch report needs the final outcome per user
+    timings = _best(lambda: project_portfolios(contributions, months, paths, seed=1, checkpoint_every=months),
+                    repeat)
+    best = min(timings)
+    return {
+        "users": users,
+        "paths": paths,
+        "months": months,
+        "best_s": round(best, 3),
+        "users_per_s": round(users / best, 1)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Monte Carlo portfolio projection")
+    parser.add_argument("--paths", type=int, default=10_000)
+    parser.add_argument("--months", type=int, default=360)
+    parser.add_argument("--users", type=int, nargs="+", default=[100, 1_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    results = {
+        "single_user": bench_single(args.paths, args.months, args.repeat),
+        "batch": [bench_batch(n, args.paths, args.months, args.repeat) for n in args.users]
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
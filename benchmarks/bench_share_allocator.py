@@ -0,0 +1,78 @@
+# -------------------------------
+# SHARE ALLOCATOR BENCHMARK
+# -------------------------------
+# Times allocate_batch() for a monthly batch of synthetic users and allocate_shares()
+# (exact solver) per user, and reports the cash each leaves uninvested.
+#
+#   python benchmarks/bench_share_allocator.py --users 100000 --stocks 5 --repeat 5
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.market.share_allocator import allocate_batch, allocate_shares, to_paise  # noqa: E402
+
+
+def _inputs(n_users: int, n_stocks: int, seed: int):
+    rng = np.random.default_rng(seed)
+    prices = np.round(rng.uniform(50, 5_000, (n_users, n_stocks)), 2)
+    budgets = np.round(rng.uniform(5_000, 200_000, n_users), 2)
+    return prices, budgets
+
+
+def bench_batch(n_users: int, n_stocks: int, repeat: int, seed: int = 7) -> dict:
+    prices, budgets = _inputs(n_users, n_stocks, seed)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        shares = allocate_batch(prices, budgets)
+        timings.append(time.perf_counter() - start)
+
+    cash_left = (to_paise(budgets) - (shares * to_paise(prices)).sum(axis=1)) / 100
+    best = min(timings)
+    return {
+        "users": n_users,
+        "stocks": n_stocks,
+        "best_ms": round(best * 1000, 3),
+        "median_ms": round(float(np.median(timings)) * 1000, 3),
+        "users_per_s": round(n_users / best),
+        "mean_cash_left": round(float(cash_left.mean()), 2),
+        "overspent_users": int((cash_left < 0).sum())
+    }
+
+
+def bench_exact(n_users: int, n_stocks: int, seed: int = 7) -> dict:
+    prices, budgets = _inputs(n_users, n_stocks, seed)
+    start = time.perf_counter()
+    results = [allocate_shares(prices[i], budgets[i]) for i in range(n_users)]
+    elapsed = time.perf_counter() - start
+    return {
+        "users": n_users,
+        "stocks": n_stocks,
+        "per_user_ms": round(elapsed / n_users * 1000, 3),
+        "mean_cash_left": round(float(np.mean([r.cash_left for r in results])), 2),
+        "exact_share": round(float(np.mean([r.exact for r in results])), 3)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the whole-share allocator")
+    parser.add_argument("--users", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--stocks", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--exact-users", type=int, default=500, help="Users solved one by one with allocate_shares")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    results = {
+        "batch": [bench_batch(n, args.stocks, args.repeat) for n in args.users],
+        "exact": bench_exact(args.exact_users, args.stocks)
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
@@ -0,0 +1,69 @@
+# -------------------------------
+# COLD-START BENCHMARK
+# -------------------------------
+# Measures, in fresh interpreters, how long it takes to import the graph and
+# compile it with create_agent(), and whether any client was built on the way.
+#
+#   python benchmarks/cold_start.py --runs 5 --output bench_output.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from src.graph.graph_creation import create_agent
+t1 = time.perf_counter()
+create_agent()
+t2 = time.perf_counter()
+from src.tools.portfolio_builder import portfolio_builder_tool
+portfolio_builder_tool.invoke({"total_savings": 47000, "user_age": 35, "insured": False})
+t3 = time.perf_counter()
+import src.config as config
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "compile_ms": (t2 - t1) * 1000,
+    "portfolio_tool_ms": (t3 - t2) * 1000,
+    "llm_client_created": config._llm_client is not None,
+    "groq_imported": "langchain_groq" in sys.modules,
+    "tavily_imported": "langchain_tavily" in sys.modules,
+}))
+"""
+
+
+def measure(runs: int) -> dict:
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "cold-start-benchmark")
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+            capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    summary = {"runs": runs}
+    for field in ("import_ms", "compile_ms", "portfolio_tool_ms"):
+        values = [s[field] for s in samples]
+        summary[field] = {"median": round(statistics.median(values), 2), "max": round(max(values), 2)}
+    for flag in ("llm_client_created", "groq_imported", "tavily_imported"):
+        summary[flag] = any(s[flag] for s in samples)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start time of create_agent()")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
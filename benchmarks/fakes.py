@@ -0,0 +1,109 @@
+# -------------------------------
+# OFFLINE BACKENDS
+# -------------------------------
+# Deterministic stand-ins for Groq and Tavily with configurable latency.
+# Install them with src.config.set_llm_client / src.tools.search_tool.set_tavily_client.
+import re
+import threading
+import time
+import uuid
+from typing import Iterator, List
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+RECOMMENDATION = (
+    "Stock name: Infosys Limited\n"
+    "Ticker: INFY\n"
+    "Current price: ₹1,500\n"
+    "Number of shares: {shares}\n"
+    "Total cost: ₹{cost:,}\n\n"
+    "Do you want to confirm buying {shares} shares of Infosys Limited at ₹1,500 per share (total ≈ ₹{cost:,})?"
+)
+
+
+class FakeChatModel:
+    """Answers every prompt the graph sends, after `latency_s`; streams `stream_chunk_chars` at a time."""
+
+    model_name = "fake-llm"
+    temperature = 0.0
+
+    def __init__(self, latency_s: float = 0.0, tools: List = None, tool_choice=None,
+                 stream_chunk_chars: int = 8, _counter: dict = None):
+        self.latency_s = latency_s
+        self.tools = tools or []
+        self.tool_choice = tool_choice
+        self.stream_chunk_chars = stream_chunk_chars
+        self._counter = _counter if _counter is not None else {"calls": 0, "lock": threading.Lock()}
+
+    @property
+    def calls(self) -> int:
+        return self._counter["calls"]
+
+    def bind_tools(self, tools: list, tool_choice=None, **kwargs) -> "FakeChatModel":
+        return FakeChatModel(self.latency_s, tools, tool_choice, self.stream_chunk_chars, self._counter)
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        with self._counter["lock"]:
+            self._counter["calls"] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+        tool_names = [getattr(t, "name", None) for t in self.tools]
+        last = str(messages[-1].content) if messages else ""
+        if "pdf_reader_tool" in tool_names and self.tool_choice != "none":
+            match = re.search(r"(\S+\.pdf)", last)
+            return AIMessage(content="", tool_calls=[{
+                "name": "pdf_reader_tool", "args": {"pdf_path": match.group(1) if match else ""},
+                "id": f"call_{uuid.uuid4().hex[:8]}"
+            }])
+        if "portfolio_builder_tool" in tool_names:
+            savings = re.search(r"savings=([\d.]+)", last)
+            return AIMessage(content="", tool_calls=[{
+                "name": "portfolio_builder_tool",
+                "args": {"total_savings": float(savings.group(1)) if savings else 0.0, "user_age": 35,
+                         "insured": False},
+                "id": f"call_{uuid.uuid4().hex[:8]}"
+            }])
+        if last.startswith("Statement part"):
+            return AIMessage(content="Income: ₹85,000\nExpenses: ₹38,000")
+        if any("PDF Content" in str(m.content) for m in messages[-2:]):
+            return AIMessage(content="Salary received: ₹85,000\nTotal spent: ₹38,000\nSavings: ₹47,000")
+
+        budget = re.search(r"budget is exactly ₹([\d,]+(?:\.\d+)?)", last)
+        equity = float(budget.group(1).replace(",", "")) if budget else 15_000.0
+        shares = max(1, int(equity // 1500))
+        return AIMessage(content=RECOMMENDATION.format(shares=shares, cost=shares * 1500))
+
+    def invoke(self, messages: List[BaseMessage], *args, validate=None, **kwargs) -> AIMessage:
+        return self._reply(messages)
+
+    def stream(self, messages: List[BaseMessage], *args, **kwargs) -> Iterator[AIMessageChunk]:
+        text = self._reply(messages).content
+        for i in range(0, len(text), self.stream_chunk_chars):
+            yield AIMessageChunk(content=text[i:i + self.stream_chunk_chars])
+
+
+class FakeSearch:
+    """Tavily replacement: `.run(query)` returns canned market results after `latency_s`."""
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def run(self, query: str) -> dict:
+        with self._lock:
+            self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return {
+            "query": query,
+            "results": [
+                {"title": "Infosys (INFY) trades at ₹1,500", "url": "https://example.com/infy",
+                 "content": "Infosys Limited (NSE: INFY) closed at ₹1,500 with steady revenue growth."},
+                {"title": "TCS (TCS) trades at ₹3,900", "url": "https://example.com/tcs",
+                 "content": "Tata Consultancy Services (NSE: TCS) closed at ₹3,900."},
+                {"title": "HDFC Bank (HDFCBANK) trades at ₹1,650", "url": "https://example.com/hdfcbank",
+                 "content": "HDFC Bank Limited (NSE: HDFCBANK) closed at ₹1,650."}
+            ]
+        }
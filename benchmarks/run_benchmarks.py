@@ -0,0 +1,269 @@
+# -------------------------------
+# OFFLINE BENCHMARK SUITE
+# -------------------------------
+# Runs the full graph against the fake LLM and search backends in benchmarks/fakes.py
+# on synthetic statements, so nothing is spent on Groq or Tavily quota.
+#
+#   python benchmarks/run_benchmarks.py --output bench/current.json
+#   python benchmarks/run_benchmarks.py --baseline bench/baseline.json --tolerance 0.25
+#
+# Measures per-node latency per statement size, end-to-end throughput at several
+# concurrency levels, and peak traced memory for create_agent() and a single run.
+# With --baseline, exits 1 when any metric regressed by more than --tolerance.
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fakes import FakeChatModel, FakeSearch  # noqa: E402
+from synthetic_statements import generate_statements  # noqa: E402
+
+# Metrics where a larger value is better; everything else is a latency or a size
+HIGHER_IS_BETTER = ("runs_per_s",)
+
+
+def _isolate(workdir: Path, force_llm_analysis: bool):
+    """Point every cache at a scratch directory; must run before any src import reads the settings."""
+    os.environ.update({
+        "GROQ_API_KEY": "offline-benchmark",
+        "TAVILY_API_KEY": "offline-benchmark",
+        "LLM_CACHE_ENABLED": "false",
+        "PDF_CACHE_DIR": str(workdir / "pdf_text"),
+        "SEARCH_CACHE_PATH": str(workdir / "search_cache.sqlite"),
+        "CHECKPOINT_DB_PATH": str(workdir / "checkpoints.sqlite"),
+    })
+    if force_llm_analysis:
+        # No parse is ever confident enough, so statements go through the LLM / map-reduce path
+        os.environ["PARSER_MIN_CONFIDENCE"] = "2"
+    os.chdir(workdir)
+
+
+def _summary_ms(seconds: list) -> dict:
+    from src.metrics import percentile
+
+    ms = [s * 1000 for s in seconds]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 0.5), 3),
+        "p95_ms": round(percentile(ms, 0.95), 3),
+        "max_ms": round(max(ms), 3)
+    }
+
+
+def _run_once(agent, pdf_path: str, thread_id: str) -> float:
+    """One full run (approved at the confirmation interrupt); returns its wall time in seconds."""
+    from langgraph.types import Command
+    from src.graph.checkpointing import run_config
+    from src.helpers.initial_state import build_initial_state
+
+    config = run_config(thread_id)
+    graph_input = build_initial_state(pdf_path, run_id=thread_id)
+    start = time.perf_counter()
+    for _ in range(2):
+        for _ in agent.stream(graph_input, config, stream_mode="updates"):
+            pass
+        if not agent.get_state(config).next:
+            break
+        graph_input = Command(resume="approve")
+    return time.perf_counter() - start
+
+
+def _node_seconds() -> dict:
+    """Seconds per node since the last metrics.reset(), from what time_node recorded.
+    Read from the nodes themselves, so parallel branches are not charged for each other."""
+    from src.metrics import metrics
+
+    totals = defaultdict(float)
+    for labels, values in metrics.samples("node_duration_seconds").items():
+        totals[dict(labels)["node"]] += sum(values)
+    return totals
+
+
+def bench_node_latency(agent, statements: dict) -> dict:
+    from src.metrics import metrics
+
+    results = {}
+    for pages, paths in statements.items():
+        per_node = defaultdict(list)
+        totals = []
+        for i, path in enumerate(paths):
+            # Runs here are sequential, so the registry holds exactly this run's node calls
+            metrics.reset()
+            totals.append(_run_once(agent, path, f"latency-{pages}-{i}"))
+            for node, seconds in _node_seconds().items():
+                per_node[node].append(seconds)
+        results[f"{pages}p"] = {
+            "end_to_end": _summary_ms(totals),
+            "nodes": {node: _summary_ms(values) for node, values in per_node.items()}
+        }
+    return results
+
+
+def bench_throughput(agent, paths: list, concurrency_levels: list, runs_per_level: int) -> dict:
+    results = {}
+    for concurrency in concurrency_levels:
+        runs = max(runs_per_level, concurrency)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(
+                lambda i: _run_once(agent, paths[i % len(paths)], f"throughput-{concurrency}-{i}"),
+                range(runs)
+            ))
+        elapsed = time.perf_counter() - start
+        results[f"c{concurrency}"] = {
+            "runs": runs,
+            "elapsed_s": round(elapsed, 3),
+            "runs_per_s": round(runs / elapsed, 2)
+        }
+    return results
+
+
+def bench_memory(pdf_path: str) -> dict:
+    from src.graph.checkpointing import memory_checkpointer
+    from src.graph.graph_creation import create_agent
+
+    tracemalloc.start()
+    agent = create_agent(checkpointer=memory_checkpointer())
+    _, compile_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    _run_once(agent, pdf_path, "memory-0")
+    _, run_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "create_agent_peak_mb": round(compile_peak / 2 ** 20, 3),
+        "run_peak_mb": round(run_peak / 2 ** 20, 3)
+    }
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """Numeric leaves as dotted keys, e.g. node_latency.10p.nodes.llm_analyzer.p95_ms."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) \
+                and not name.endswith((".count", ".runs", ".elapsed_s")):
+            flat[name] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than the baseline by more than `tolerance` (a fraction)."""
+    regressions = []
+    for name, base in baseline.items():
+        value = current.get(name)
+        if value is None or not base:
+            continue
+        change = (value - base) / base
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        if worse > tolerance:
+            regressions.append({"metric": name, "baseline": base, "current": value,
+                                "change_pct": round(change * 100, 1)})
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks (fake LLM and search)")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50], help="Statement sizes in pages")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per statement size")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--runs", type=int, default=32, help="Runs per concurrency level")
+    parser.add_argument("--throughput-pages", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--search-latency-ms", type=float, default=100.0)
+    parser.add_argument("--force-llm-analysis", action="store_true",
+                        help="Skip the rule-based statement parser so analysis goes through the fake LLM")
+    parser.add_argument("--workdir", help="Scratch directory (default: a temporary one, removed afterwards)")
+    parser.add_argument("--output", help="JSON file for the results")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression as a fraction")
+    args = parser.parse_args(argv)
+
+    output = Path(args.output).resolve() if args.output else None
+    baseline_path = Path(args.baseline).resolve() if args.baseline else None
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="bench_")).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    _isolate(workdir, args.force_llm_analysis)
+
+    import src.config as config
+    from src.graph.checkpointing import memory_checkpointer
+    from src.graph.graph_creation import create_agent
+    from src.logger import log
+    from src.tools.search_tool import set_tavily_client
+
+    llm = FakeChatModel(latency_s=args.llm_latency_ms / 1000)
+    search = FakeSearch(latency_s=args.search_latency_ms / 1000)
+    config.set_llm_client(llm)
+    set_tavily_client(search)
+
+    # Keep node banners and INFO console logs out of the report; the file log is untouched
+    log.info("Offline benchmark started", {"workdir": str(workdir)})
+    log.set_console_level(logging.WARNING)
+
+    statements = {
+        pages: generate_statements(str(workdir / "statements"), [pages], copies=args.repeat)
+        for pages in args.pages
+    }
+    throughput_paths = generate_statements(
+        str(workdir / "throughput"), [args.throughput_pages], copies=max(args.runs, max(args.concurrency))
+    )
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = create_agent(checkpointer=memory_checkpointer())
+            results = {
+                "node_latency": bench_node_latency(agent, statements),
+                "throughput": bench_throughput(agent, throughput_paths, args.concurrency, args.runs),
+                "memory": bench_memory(statements[max(args.pages)][0])
+            }
+    finally:
+        if not args.workdir:
+            os.chdir(ROOT)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "llm_latency_ms": args.llm_latency_ms,
+            "search_latency_ms": args.search_latency_ms,
+            "force_llm_analysis": args.force_llm_analysis,
+            "llm_calls": llm.calls,
+            "search_calls": search.calls
+        },
+        "results": results,
+        "metrics": flatten(results)
+    }
+
+    exit_code = 0
+    if baseline_path:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        report["regressions"] = compare(report["metrics"], baseline.get("metrics", {}), args.tolerance)
+        exit_code = 1 if report["regressions"] else 0
+
+    print(json.dumps(report, indent=2))
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
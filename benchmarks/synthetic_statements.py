@@ -0,0 +1,87 @@
+# -------------------------------
+# SYNTHETIC STATEMENTS
+# -------------------------------
+# Writes deterministic bank-statement PDFs of any length for the benchmarks.
+# Plain PDF 1.4 with the built-in Helvetica font, so no PDF library is needed.
+#
+#   python benchmarks/synthetic_statements.py --out .cache/bench/statements --pages 1 10 100
+import argparse
+import random
+from pathlib import Path
+from typing import List
+
+LINES_PER_PAGE = 48
+
+CREDITS = ["Salary received", "Interest credited", "Refund received", "Dividend received", "Cashback credited"]
+DEBITS = ["Paid electricity bill", "Rent paid", "Grocery purchase", "UPI sent to friend", "ATM withdrawal",
+          "EMI debited", "Paid mobile bill", "Fuel purchase", "Restaurant spent", "Insurance premium paid"]
+
+
+def statement_lines(pages: int, seed: int = 0) -> List[str]:
+    """One salary credit per page plus small debits; the same seed always gives the same text."""
+    rng = random.Random(seed)
+    lines = []
+    for page in range(pages):
+        day = page % 28 + 1
+        lines.append(f"{day:02d}/11/2025 {rng.choice(CREDITS)} Rs.{rng.randint(60, 150) * 1000:,}.00")
+        for _ in range(LINES_PER_PAGE - 1):
+            lines.append(f"{rng.randint(1, 28):02d}/11/2025 {rng.choice(DEBITS)} "
+                         f"Rs.{rng.randint(50, 1200):,}.{rng.randint(0, 99):02d}")
+    return lines
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_statement_pdf(path: str, pages: int, seed: int = 0) -> str:
+    lines = statement_lines(pages, seed)
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    page_ids = []
+    for page in range(pages):
+        page_lines = lines[page * LINES_PER_PAGE:(page + 1) * LINES_PER_PAGE]
+        text = "".join(f"({_escape(line)}) Tj T*\n" for line in page_lines)
+        stream = f"BT /F1 9 Tf 12 TL 40 800 Td\n{text}ET".encode("latin-1")
+        page_id, content_id = 4 + page * 2, 5 + page * 2
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(page_id)
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (obj_id, objects[obj_id])
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for obj_id in sorted(objects):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_bytes(bytes(out))
+    return path
+
+
+def generate_statements(out_dir: str, pages: List[int], copies: int = 1) -> List[str]:
+    """`copies` distinct statements (different seeds) for every page count."""
+    return [
+        write_statement_pdf(str(Path(out_dir) / f"statement_{n}p_{c}.pdf"), n, seed=n * 1000 + c)
+        for n in pages for c in range(copies)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic statement PDFs")
+    parser.add_argument("--out", default=".cache/bench/statements")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--copies", type=int, default=1)
+    args = parser.parse_args()
+    for path in generate_statements(args.out, args.pages, args.copies):
+        print(path)
@@ -0,0 +1,210 @@
+# -------------------------------
+# BATCH RUN
+# -------------------------------
+# Drives many statements through one compiled graph concurrently.
+#
+#   python -m src.batch_runner --statements data/statements --age 35 --output results.jsonl
+#   python -m src.batch_runner --manifest users.csv --concurrency 32
+#
+# A manifest is a .csv or .jsonl file with the columns/keys:
+#   user_id, pdf_path, user_age, insured
+# Relative pdf paths are resolved against the manifest's directory.
+#
+# Every run is checkpointed under the thread id "<user_id>:<label>" (label defaults
+# to the current month). Re-running the same batch skips completed users and
+# resumes interrupted ones from their last completed node. Runs end parked at the
+# purchase confirmation interrupt; approve them later with `python -m src.confirm`.
+import argparse
+import asyncio
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from src.config import llm_cache_stats, METRICS_PATH
+from src.graph.checkpointing import async_sqlite_checkpointer, run_config
+from src.graph.graph_creation import create_agent
+from src.helpers.initial_state import build_initial_state
+from src.helpers.pretty_print import banner
+from src.helpers.provider_guard import provider_stats
+from src.logger import log
+from src.metrics import metrics
+from src.tools.pdf_reader import pdf_text_cache
+
+
+@dataclass
+class StatementJob:
+    user_id: str
+    pdf_path: str
+    user_age: int = 35
+    insured: bool = False
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "1", "yes", "y")
+
+
+def load_jobs(statements_dir: Optional[str] = None, manifest: Optional[str] = None,
+              default_age: int = 35, default_insured: bool = False) -> List[StatementJob]:
+    """Collect jobs from a manifest file, or from every PDF in a directory."""
+    if manifest:
+        manifest_path = Path(manifest)
+        base_dir = manifest_path.parent
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            if manifest_path.suffix.lower() == ".jsonl":
+                rows = [json.loads(line) for line in f if line.strip()]
+            else:
+                rows = list(csv.DictReader(f))
+
+        jobs = []
+        for row in rows:
+            pdf_path = Path(row["pdf_path"])
+            if not pdf_path.is_absolute():
+                pdf_path = base_dir / pdf_path
+            age = row.get("user_age")
+            insured = row.get("insured")
+            jobs.append(StatementJob(
+                user_id=str(row.get("user_id") or pdf_path.stem),
+                pdf_path=str(pdf_path),
+                user_age=int(age) if age not in (None, "") else default_age,
+                insured=_parse_bool(insured) if insured not in (None, "") else default_insured
+            ))
+        return jobs
+
+    if statements_dir:
+        return [
+            StatementJob(user_id=p.stem, pdf_path=str(p), user_age=default_age, insured=default_insured)
+            for p in sorted(Path(statements_dir).glob("*.pdf"))
+        ]
+
+    raise ValueError("Either a statements directory or a manifest is required")
+
+
+def _result_record(job: StatementJob, thread_id: str, result: Optional[dict], duration: float,
+                   error: Optional[str] = None) -> dict:
+    result = result or {}
+    portfolio = result.get("portfolio")
+    return {
+        "user_id": job.user_id,
+        "thread_id": thread_id,
+        "pdf_path": job.pdf_path,
+        "user_age": job.user_age,
+        "insured": job.insured,
+        "status": "failed" if error else (
+            "awaiting_confirmation" if result.get("investment_execution") == "awaiting_confirmation" else "completed"
+        ),
+        "error": error,
+        "total_savings": result.get("total_savings"),
+        "portfolio": portfolio.as_dict() if portfolio else None,
+        "projection": (result.get("projection") or {}).get("final"),
+        "investment_instruments": result.get("investment_instruments"),
+        "investment_execution": result.get("investment_execution"),
+        "duration_ms": round(duration * 1000, 2)
+    }
+
+
+async def _run_or_resume(agent, job: StatementJob, thread_id: str) -> dict:
+    """Start a fresh run, resume an unfinished one, or return the stored result of a finished one."""
+    config = run_config(thread_id)
+    snapshot = await agent.aget_state(config)
+    if snapshot.values and (not snapshot.next or any(task.interrupts for task in snapshot.tasks)):
+        # Finished, or parked at the confirmation interrupt waiting for a decision
+        return snapshot.values
+    if snapshot.values:
+        log.info("Resuming batch run", {"thread_id": thread_id, "next": list(snapshot.next)})
+        return await agent.ainvoke(None, config)
+
+    initial_state = build_initial_state(
+        job.pdf_path, user_age=job.user_age, insured=job.insured, run_id=thread_id
+    )
+    return await agent.ainvoke(initial_state, config)
+
+
+async def run_batch(jobs: List[StatementJob], output_path: str, concurrency: int = 8,
+                    label: Optional[str] = None) -> dict:
+    """Run every job through one compiled graph, at most `concurrency` at a time.
+
+    One JSON line is appended to `output_path` per job as soon as it finishes.
+    """
+    # Nodes are sync functions; ainvoke runs them on the loop's default executor,
+    # which would otherwise cap concurrency at min(32, cpu + 4) threads.
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+
+    label = label or time.strftime("%Y-%m")
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"completed": 0, "awaiting_confirmation": 0, "failed": 0}
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    batch_start = time.perf_counter()
+
+    async with async_sqlite_checkpointer() as checkpointer:
+        agent = create_agent(checkpointer=checkpointer)
+
+        with open(output_path, "a", encoding="utf-8") as out:
+            async def run_one(job: StatementJob):
+                async with semaphore:
+                    start = time.perf_counter()
+                    thread_id = f"{job.user_id}:{label}"
+                    try:
+                        result = await _run_or_resume(agent, job, thread_id)
+                        record = _result_record(job, thread_id, result, time.perf_counter() - start)
+                    except Exception as e:
+                        log.error("Batch run failed", {"user_id": job.user_id, "thread_id": thread_id, "error": str(e)})
+                        record = _result_record(job, thread_id, None, time.perf_counter() - start, error=str(e))
+
+                    counts[record["status"]] += 1
+                    out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                    out.flush()
+
+            await asyncio.gather(*(run_one(job) for job in jobs))
+
+    elapsed = time.perf_counter() - batch_start
+    summary = {
+        "runs": len(jobs),
+        "completed": counts["completed"],
+        "awaiting_confirmation": counts["awaiting_confirmation"],
+        "failed": counts["failed"],
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "runs_per_min": round(len(jobs) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "pdf_cache": pdf_text_cache.stats(),
+        "llm_cache": llm_cache_stats(),
+        "providers": provider_stats()
+    }
+    log.info("Batch finished", summary)
+    metrics.write_prometheus(METRICS_PATH)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Monthly Stock Picker over many statements")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--statements", help="Directory of statement PDFs (one user per file)")
+    source.add_argument("--manifest", help="CSV or JSONL manifest: user_id, pdf_path, user_age, insured")
+    parser.add_argument("--age", type=int, default=35, help="Default age when not in the manifest")
+    parser.add_argument("--insured", action="store_true", help="Default insured flag when not in the manifest")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum runs in flight")
+    parser.add_argument("--output", default="results/batch_results.jsonl", help="JSONL file for per-user results")
+    parser.add_argument("--label", help="Batch label used in thread ids (default: current YYYY-MM)")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.statements, args.manifest, args.age, args.insured)
+    banner(f"BATCH RUN: {len(jobs)} statements", "=", 70)
+    summary = asyncio.run(run_batch(jobs, args.output, max(1, args.concurrency), label=args.label))
+
+    print(f"Completed      : {summary['completed'] + summary['awaiting_confirmation']}/{summary['runs']} "
+          f"(awaiting confirmation: {summary['awaiting_confirmation']}, failed: {summary['failed']})")
+    print(f"Elapsed        : {summary['elapsed_s']}s")
+    print(f"Throughput     : {summary['runs_per_min']} runs/min at concurrency {summary['concurrency']}")
+    print(f"Results        : {args.output}")
+    print(f"Metrics        : {METRICS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 # src/config.py
+# Settings are plain module constants; clients are created lazily by the
+# factories at the bottom so importing the graph stays cheap.
 import os
+import threading
+from typing import Optional
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
 
-# Load environment variables from .env file
+# Load environment variables from .env file (the settings below read them)
 load_dotenv()
 
 # Tavily Search API Key
@@ -14,14 +17,185 @@ TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_LLM_MODEL = os.getenv("GROQ_LLM_MODEL", "llama-3.3-70b-versatile")
 
+# Rule-based statement parsing is trusted when at least this share of amount lines is classified
+PARSER_MIN_CONFIDENCE = float(os.getenv("PARSER_MIN_CONFIDENCE", "0.8"))
 
-if not GROQ_API_KEY:
-    raise ValueError("❌ GROQ_API_KEY not found. Please set it in your .env file.")
+# On-disk cache of extracted PDF text
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", ".cache/pdf_text")
+PDF_CACHE_MAX_MB = float(os.getenv("PDF_CACHE_MAX_MB", "256"))
 
-# Initialize Groq LLM client
-llm_client = ChatGroq(
-    api_key=GROQ_API_KEY,
-    model=GROQ_LLM_MODEL,
-    temperature=0.5,   # You can adjust this later
+# With PDF_EXTRACT_WORKERS > 1, statements of at least PDF_PARALLEL_MIN_PAGES pages are
+# decoded on a process pool. Pool start-up costs ~1-2s, so this only pays off for long statements.
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "1"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+
+# Per-node prompt budgets in (approximate) tokens
+CONTEXT_TOKEN_BUDGETS = {
+    "transaction_analyzer": int(os.getenv("CONTEXT_BUDGET_TRANSACTION_ANALYZER", "2000")),
+    "transaction_analyzer_tools": int(os.getenv("CONTEXT_BUDGET_TRANSACTION_ANALYZER_TOOLS", "16000")),
+    "portfolio_llm": int(os.getenv("CONTEXT_BUDGET_PORTFOLIO_LLM", "1500")),
+    "llm_investment_executor": int(os.getenv("CONTEXT_BUDGET_INVESTMENT_EXECUTOR", "6000")),
+    "transaction_analyzer_chunk": int(os.getenv("CONTEXT_BUDGET_TRANSACTION_ANALYZER_CHUNK", "4000")),
+}
+
+# Portfolio stage: "direct" allocates deterministically when savings, age and insured are
+# already typed in the state; "llm" keeps the forced portfolio_builder_tool call
+PORTFOLIO_MODE = os.getenv("PORTFOLIO_MODE", "direct")
+
+# Statement analysis: "single" sends the whole text in one request, "map_reduce" analyzes
+# line-aligned chunks concurrently, "auto" switches to map_reduce above ANALYZER_CHUNK_CHARS
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "auto")
+ANALYZER_CHUNK_CHARS = int(os.getenv("ANALYZER_CHUNK_CHARS", "8000"))
+ANALYZER_CHUNK_WORKERS = int(os.getenv("ANALYZER_CHUNK_WORKERS", "4"))
+
+# Render the stock recommendation as tokens arrive instead of after the full reply
+STREAM_RECOMMENDATION = os.getenv("STREAM_RECOMMENDATION", "true").lower() == "true"
+
+# Per-run graph checkpoints (resume with: python -m src.resume <thread_id>)
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", ".cache/checkpoints.sqlite")
+
+# Persistent LLM response cache (set LLM_CACHE_ENABLED=false to always call Groq)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite")
+LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", str(24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+# Web search results are shared by every run inside one time bucket (default: one day)
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", ".cache/search_cache.sqlite")
+SEARCH_CACHE_TTL_S = float(os.getenv("SEARCH_CACHE_TTL_S", str(24 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000"))
+
+# Stock research for the picker; fetched in parallel with statement analysis and shared
+# by every run through the search cache
+MARKET_RESEARCH_QUERY = os.getenv(
+    "MARKET_RESEARCH_QUERY", "best fundamentally strong Indian NSE stocks to buy this month with current share price"
 )
-print(f"✅ LLM initialized with model: {GROQ_LLM_MODEL}")
+MARKET_RESEARCH_MAX_CHARS = int(os.getenv("MARKET_RESEARCH_MAX_CHARS", "12000"))
+
+# Local daily OHLCV store used to check the picker's price and share count
+# (build with: python -m src.market.market_data_store build <csv...>)
+MARKET_DATA_DIR = os.getenv("MARKET_DATA_DIR", "data/market_store")
+# Bars older than this many calendar days are too stale to correct the LLM's price with
+MARKET_DATA_MAX_AGE_DAYS = int(os.getenv("MARKET_DATA_MAX_AGE_DAYS", "7"))
+# Screener: the picker prompt gets the top N affordable tickers from the store instead of
+# the full search results (which are then cut to SCREENER_RESEARCH_CHARS). Optional
+# `ticker, pe` CSV for the valuation factor.
+SCREENER_TOP_N = int(os.getenv("SCREENER_TOP_N", "10"))
+SCREENER_RESEARCH_CHARS = int(os.getenv("SCREENER_RESEARCH_CHARS", "2000"))
+FUNDAMENTALS_PATH = os.getenv("FUNDAMENTALS_PATH", "data/fundamentals.csv")
+
+# Monte Carlo outlook of the allocation after the portfolio stage: PROJECTION_PATHS paths of
+# PROJECTION_YEARS years of monthly contributions (PROJECTION_SEED="" for fresh randomness)
+PROJECTION_ENABLED = os.getenv("PROJECTION_ENABLED", "true").lower() == "true"
+PROJECTION_YEARS = int(os.getenv("PROJECTION_YEARS", "30"))
+PROJECTION_PATHS = int(os.getenv("PROJECTION_PATHS", "10000"))
+PROJECTION_SEED = int(os.getenv("PROJECTION_SEED", "42")) if os.getenv("PROJECTION_SEED", "42") else None
+
+# HTTP service mode (python -m src.server): concurrent graph runs, plus requests allowed to wait for a worker
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8080"))
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "8"))
+SERVICE_MAX_QUEUE = int(os.getenv("SERVICE_MAX_QUEUE", "32"))
+# The service only reads statements under this directory (request paths are resolved, symlinks included)
+STATEMENTS_ROOT = os.getenv("STATEMENTS_ROOT", "data")
+
+
+# Client-side limits shared by every run in the process (0 disables a bucket). Match them to
+# the account's Groq / Tavily quotas; a 429 with Retry-After pauses all callers of that provider.
+GROQ_REQUESTS_PER_MIN = float(os.getenv("GROQ_REQUESTS_PER_MIN", "30"))
+GROQ_TOKENS_PER_MIN = float(os.getenv("GROQ_TOKENS_PER_MIN", "12000"))
+TAVILY_REQUESTS_PER_MIN = float(os.getenv("TAVILY_REQUESTS_PER_MIN", "60"))
+PROVIDER_MAX_ATTEMPTS = int(os.getenv("PROVIDER_MAX_ATTEMPTS", "4"))
+PROVIDER_RETRY_BASE_S = float(os.getenv("PROVIDER_RETRY_BASE_S", "0.5"))
+PROVIDER_RETRY_MAX_S = float(os.getenv("PROVIDER_RETRY_MAX_S", "20"))
+# The circuit opens after this many consecutive failures and lets one probe through after BREAKER_RESET_S
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_S = float(os.getenv("BREAKER_RESET_S", "30"))
+
+# Logging: records below LOG_LEVEL are dropped before their payload is built (DEBUG adds
+# content / argument dumps). Files are written as JSON lines to LOG_DIR/agent.jsonl.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+
+# Prometheus text file written at the end of CLI and batch runs (the service serves GET /metrics)
+METRICS_PATH = os.getenv("METRICS_PATH", ".cache/metrics.prom")
+
+
+# -------------------------------
+# LAZY CLIENTS
+# -------------------------------
+_llm_client = None
+_llm_lock = threading.Lock()
+
+
+def _create_llm_client():
+    if not GROQ_API_KEY:
+        raise ValueError("❌ GROQ_API_KEY not found. Please set it in your .env file.")
+
+    from langchain_groq import ChatGroq
+    from src.helpers.llm_cache import CachedChatModel
+    from src.helpers.llm_guard import GuardedChatModel
+    from src.helpers.llm_metrics import LLMMetricsCallback
+    from src.helpers.provider_guard import groq_guard
+    from src.helpers.sqlite_cache import SQLiteCache
+    from src.logger import log
+
+    client = ChatGroq(
+        api_key=GROQ_API_KEY,
+        model=GROQ_LLM_MODEL,
+        temperature=0.5,   # You can adjust this later
+        max_retries=0,     # retries are coordinated by groq_guard
+        callbacks=[LLMMetricsCallback(GROQ_LLM_MODEL)]
+    )
+    client = GuardedChatModel(client, groq_guard)
+    if LLM_CACHE_ENABLED:
+        client = CachedChatModel(
+            client,
+            SQLiteCache(LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_S, max_entries=LLM_CACHE_MAX_ENTRIES)
+        )
+    log.info(f"✅ LLM initialized with model: {GROQ_LLM_MODEL}")
+    return client
+
+
+def get_llm_client():
+    """Shared Groq client, created on first use."""
+    global _llm_client
+    if _llm_client is None:
+        with _llm_lock:
+            if _llm_client is None:
+                _llm_client = _create_llm_client()
+    return _llm_client
+
+
+def set_llm_client(client):
+    """Install a replacement client (benchmarks, offline runs); None restores the lazy Groq client.
+    It must accept invoke(messages, validate=None) like the wrappers in helpers/llm_guard.py."""
+    global _llm_client
+    with _llm_lock:
+        _llm_client = client
+
+
+def llm_cache_stats() -> Optional[dict]:
+    """Hit/miss counts of the LLM cache, or None if no cached client has been created."""
+    stats = getattr(_llm_client, "stats", None) if _llm_client is not None else None
+    return stats() if callable(stats) else None
+
+
+def _llm_cache_gauges():
+    from src.metrics import cache_gauges
+    return cache_gauges("llm", llm_cache_stats())
+
+
+def __getattr__(name: str):
+    # Backwards compatibility for `from src.config import llm_client`
+    if name == "llm_client":
+        return get_llm_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _register_metrics():
+    from src.metrics import metrics
+    metrics.register_collector(_llm_cache_gauges)
+
+
+_register_metrics()
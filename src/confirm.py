@@ -0,0 +1,53 @@
+# -------------------------------
+# CONFIRM
+# -------------------------------
+# Approves or rejects a recommendation parked at the confirmation interrupt.
+#
+#   python -m src.confirm --list
+#   python -m src.confirm <thread_id> approve
+#   python -m src.confirm <thread_id> reject
+import argparse
+
+from src.graph.checkpointing import sqlite_checkpointer
+from src.graph.graph_creation import create_agent
+from src.helpers.confirmation import pending_confirmation, resume_with_decision
+from src.helpers.pretty_print import banner, stock_recommendation, warning
+from src.logger import log
+from src.resume import list_thread_ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Confirm or cancel a pending Monthly Stock Picker purchase")
+    parser.add_argument("thread_id", nargs="?", help="Run / thread id waiting for confirmation")
+    parser.add_argument("decision", nargs="?", choices=["approve", "reject"], help="Decision to resume the run with")
+    parser.add_argument("--list", action="store_true", help="List runs waiting for confirmation")
+    args = parser.parse_args(argv)
+
+    with sqlite_checkpointer() as checkpointer:
+        agent = create_agent(checkpointer=checkpointer)
+
+        if args.list or not args.thread_id:
+            for thread_id in list_thread_ids(checkpointer):
+                pending = pending_confirmation(agent, thread_id)
+                if pending:
+                    first_line = (pending.get("recommendation") or "").strip().splitlines()[:1]
+                    print(f"{thread_id:<40} {first_line[0] if first_line else ''}")
+            return
+
+        pending = pending_confirmation(agent, args.thread_id)
+        if not pending:
+            warning(f"Run {args.thread_id} is not waiting for confirmation")
+            return
+
+        if not args.decision:
+            stock_recommendation(pending.get("recommendation") or "")
+            print(f"\nResume with: python -m src.confirm {args.thread_id} approve|reject")
+            return
+
+        banner(f"CONFIRMING RUN {args.thread_id}", "=", 70)
+        log.info("Confirmation received", {"thread_id": args.thread_id, "decision": args.decision})
+        resume_with_decision(agent, args.thread_id, args.decision)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from typing import Union, TypedDict, Annotated, Optional
 from langgraph.graph import add_messages
+from src.entity.portfolio_allocation import PortfolioAllocation
 
 
 # -------------------------------
@@ -8,22 +9,27 @@ from langgraph.graph import add_messages
 def update_savings(existing: Union[float, None], new: Union[float, None]) -> float:
     return new if new is not None else (existing or 0.0)
 
-def update_formatted_savings(existing: Optional[str], new: Optional[str]) -> Optional[str]:
-    return new if new is not None else existing
-
 def keep_first(existing, new):
     return existing if existing is not None else new
 
+def keep_latest(existing, new):
+    return new if new is not None else existing
+
 # -------------------------------
 # STATE DEFINITION
 # -------------------------------
 class State(TypedDict):
     messages: Annotated[list, add_messages]
     total_savings: Annotated[Union[float, None], update_savings]
-    formatted_savings: Annotated[Optional[str], update_formatted_savings]
     user_age: Annotated[Union[int, None], keep_first]
     insured: Annotated[Union[bool, None], keep_first]
-    portfolio: Annotated[Union[dict, None], keep_first]
+    portfolio: Annotated[Optional[PortfolioAllocation], keep_first]
+    projection: Annotated[Optional[dict], keep_first]
     investment_instruments: Annotated[Union[list, None], keep_first]
+    market_research: Annotated[Optional[str], keep_first]
+    investment_execution: Annotated[Optional[str], keep_latest]
+    pending_recommendation: Annotated[Optional[str], keep_latest]
+    statement_path: Annotated[Optional[str], keep_first]
+    run_id: Annotated[Optional[str], keep_first]
 
 
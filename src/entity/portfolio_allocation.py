@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+
+# -------------------------------
+# PORTFOLIO ALLOCATION
+# -------------------------------
+@dataclass(slots=True)
+class PortfolioAllocation:
+    """Rupee amounts per asset class. Formatting happens only in helpers/pretty_print."""
+    equity: float = 0.0
+    bonds: float = 0.0
+    emergency_fund: float = 0.0
+    insurance: float = 0.0
+
+    @classmethod
+    def from_row(cls, row: Sequence[float]) -> "PortfolioAllocation":
+        """From one row of tools.portfolio_builder.build_portfolios."""
+        return cls(float(row[0]), float(row[1]), float(row[2]), float(row[3]))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PortfolioAllocation":
+        """From the numeric dict returned by portfolio_builder_tool."""
+        return cls(
+            equity=float(data.get("equity", 0.0)),
+            bonds=float(data.get("bonds", 0.0)),
+            emergency_fund=float(data.get("emergency_fund", 0.0)),
+            insurance=float(data.get("insurance", 0.0))
+        )
+
+    @property
+    def total(self) -> float:
+        return self.equity + self.bonds + self.emergency_fund + self.insurance
+
+    def as_dict(self) -> dict:
+        return {
+            "equity": self.equity,
+            "bonds": self.bonds,
+            "emergency_fund": self.emergency_fund,
+            "insurance": self.insurance
+        }
@@ -0,0 +1,56 @@
+# -------------------------------
+# CHECKPOINTING
+# -------------------------------
+# Persists graph state after every node in a local SQLite file, keyed by thread id,
+# so a failed or interrupted run resumes from its last completed node.
+import sqlite3
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Optional
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.config import CHECKPOINT_DB_PATH
+
+# Custom types stored in State that the checkpointer may deserialize
+_ALLOWED_STATE_TYPES = [("src.entity.portfolio_allocation", "PortfolioAllocation")]
+
+
+def _serializer() -> JsonPlusSerializer:
+    return JsonPlusSerializer(allowed_msgpack_modules=_ALLOWED_STATE_TYPES)
+
+
+def run_config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def memory_checkpointer():
+    """In-process checkpointer (benchmarks, tests): interrupts work, nothing touches disk."""
+    from langgraph.checkpoint.memory import InMemorySaver
+    return InMemorySaver(serde=_serializer())
+
+
+@contextmanager
+def sqlite_checkpointer(path: Optional[str] = None):
+    """Sync SQLite checkpointer for invoke()/stream()."""
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    path = path or CHECKPOINT_DB_PATH
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    try:
+        yield SqliteSaver(conn, serde=_serializer())
+    finally:
+        conn.close()
+
+
+@asynccontextmanager
+async def async_sqlite_checkpointer(path: Optional[str] = None):
+    """Async SQLite checkpointer for ainvoke()/abatch()."""
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    path = path or CHECKPOINT_DB_PATH
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    async with aiosqlite.connect(path) as conn:
+        yield AsyncSqliteSaver(conn, serde=_serializer())
@@ -1,44 +1,62 @@
 # -------------------------------
 # GRAPH CREATION
 # -------------------------------
-from langgraph.constants import END
+from langgraph.constants import START, END
 from langgraph.graph import StateGraph
 
 from src.entity.finance_state import State
-from src.helpers.desicions import should_continue
-from src.nodes.financial_instrument_picker import llm_investment_executor_node, investment_tools_node
-from src.nodes.portfolio_allocator import llm_portfolio_node, portfolio_tools_node
+from src.helpers.desicions import should_continue, route_portfolio, needs_confirmation
+from src.nodes.financial_instrument_picker import (llm_investment_executor_node, investment_confirmation_node,
+                                                   investment_tools_node)
+from src.nodes.market_research import market_research_node
+from src.nodes.portfolio_allocator import (llm_portfolio_node, portfolio_tools_node, portfolio_direct_node,
+                                          portfolio_projection_node)
 from src.nodes.transaction_analyzer import llm_transaction_analyzer_node, transaction_analyzer_tools_node
 
 
-def create_agent():
+def create_agent(checkpointer=None):
+    """Compile the graph; pass a checkpointer (see graph/checkpointing.py) to persist and resume runs."""
     graph = StateGraph(State)
 
     # --- Add nodes ---
     graph.add_node("llm_analyzer", llm_transaction_analyzer_node)
     graph.add_node("transaction_analyzer_tools", transaction_analyzer_tools_node)
+    graph.add_node("portfolio_direct", portfolio_direct_node)
     graph.add_node("portfolio_llm", llm_portfolio_node)
     graph.add_node("portfolio_tools", portfolio_tools_node)
+    graph.add_node("portfolio_projection", portfolio_projection_node)
+    graph.add_node("market_research", market_research_node)
     graph.add_node("llm_investment_executor", llm_investment_executor_node)
+    graph.add_node("investment_confirmation", investment_confirmation_node)
     graph.add_node("investment_tools", investment_tools_node)
 
-    # --- Entry Point ---
-    graph.set_entry_point("llm_analyzer")
+    # --- Entry Points ---
+    # Market research does not depend on the statement, so it runs alongside the analyzer
+    graph.add_edge(START, "llm_analyzer")
+    graph.add_edge(START, "market_research")
 
 
 
     # --- Add Edges ---
     graph.add_conditional_edges("llm_analyzer", should_continue,{"transaction_analyzer_tools": "transaction_analyzer_tools",END: "transaction_analyzer_tools"})
-    graph.add_edge("transaction_analyzer_tools", "portfolio_llm")
+    graph.add_conditional_edges("transaction_analyzer_tools", route_portfolio,
+                                {"portfolio_direct": "portfolio_direct", "portfolio_llm": "portfolio_llm"})
     graph.add_edge("portfolio_llm", "portfolio_tools")
-    graph.add_edge("portfolio_tools", "llm_investment_executor")
+    # The picker waits for both branches: whichever portfolio path ran, plus market research
+    graph.add_edge(["portfolio_direct", "market_research"], "llm_investment_executor")
+    graph.add_edge(["portfolio_tools", "market_research"], "llm_investment_executor")
+    # The projection only reports the allocation's outlook, so it runs beside the picker
+    graph.add_edge("portfolio_direct", "portfolio_projection")
+    graph.add_edge("portfolio_tools", "portfolio_projection")
+    graph.add_edge("portfolio_projection", END)
     # graph.add_edge("llm_investment_executor", "investment_tools")
     # graph.add_edge("investment_tools", END)
 
-    # In graph_creation.py — keep edges simple
-    graph.add_edge("portfolio_tools", "llm_investment_executor")
-    graph.add_edge("llm_investment_executor", END)  # Skip tools node if not needed
+    # Confirmation is an interrupt: the run is checkpointed and resumed with Command(resume=...)
+    graph.add_conditional_edges("llm_investment_executor", needs_confirmation,
+                                {"investment_confirmation": "investment_confirmation", END: END})
+    graph.add_edge("investment_confirmation", END)
     # Remove: graph.add_edge("llm_investment_executor", "investment_tools")
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
 
@@ -0,0 +1,35 @@
+# -------------------------------
+# PURCHASE CONFIRMATION
+# -------------------------------
+# Runs park at investment_confirmation_node as a graph interrupt; the pending
+# recommendation lives in the checkpoint until a decision resumes the thread.
+from typing import Optional
+
+from langgraph.types import Command
+
+from src.graph.checkpointing import run_config
+
+APPROVE_WORDS = ("approve", "approved", "confirm", "yes", "y")
+
+
+def is_approval(decision) -> bool:
+    """Accept True, "approve"/"yes"/"y", or {"decision": ...} as an approval."""
+    if isinstance(decision, dict):
+        decision = decision.get("decision")
+    if isinstance(decision, bool):
+        return decision
+    return str(decision or "").strip().lower() in APPROVE_WORDS
+
+
+def pending_confirmation(agent, thread_id: str) -> Optional[dict]:
+    """Interrupt payload a thread is waiting on, or None if it is not parked at confirmation."""
+    snapshot = agent.get_state(run_config(thread_id))
+    for task in snapshot.tasks:
+        for pending in task.interrupts:
+            return pending.value
+    return None
+
+
+def resume_with_decision(agent, thread_id: str, decision) -> dict:
+    """Resume a parked thread with an approve / reject decision and return the final state."""
+    return agent.invoke(Command(resume=decision), run_config(thread_id))
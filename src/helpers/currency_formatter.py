@@ -1,6 +0,0 @@
-def format_currency_inr(amount: float) -> str:
-    try:
-        formatted = f"₹{amount:,.2f}"
-        return formatted
-    except Exception:
-        return "₹0.00"
\ No newline at end of file
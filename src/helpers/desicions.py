@@ -2,6 +2,7 @@
 # DECISION LOGIC
 # -------------------------------
 from langgraph.constants import END
+from src.config import PORTFOLIO_MODE
 from src.entity.finance_state import State
 
 
@@ -10,3 +11,21 @@ def should_continue(state: State):
  if hasattr(last_message, "tool_calls") and last_message.tool_calls:
     return "transaction_analyzer_tools"
  return END
+
+
+def route_portfolio(state: State):
+ """Skip the forced tool-calling LLM round trip when the inputs are already typed."""
+ typed = (
+     isinstance(state.get("total_savings"), (int, float))
+     and isinstance(state.get("user_age"), int)
+     and isinstance(state.get("insured"), bool)
+ )
+ if PORTFOLIO_MODE != "llm" and typed:
+    return "portfolio_direct"
+ return "portfolio_llm"
+
+
+def needs_confirmation(state: State):
+ if state.get("pending_recommendation"):
+    return "investment_confirmation"
+ return END
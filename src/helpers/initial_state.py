@@ -0,0 +1,27 @@
+from typing import Optional
+
+from langchain_core.messages import SystemMessage, HumanMessage
+from src.helpers.load_prompt import load_prompt
+
+
+def build_initial_state(pdf_path: str, user_age: int = 35, insured: bool = False,
+                        run_id: Optional[str] = None) -> dict:
+    """Builds the graph input for one statement / user; run_id (the thread id) tags logs."""
+    system_prompt = load_prompt("system_prompt_transaction_analyzer.txt")
+    user_prompt = load_prompt("user_prompt_transaction_analyzer.txt")
+    human_prompt = user_prompt.format(test_pdf=pdf_path)
+    return {
+        "messages": [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=human_prompt)
+        ],
+        "total_savings": None,
+        "user_age": user_age,
+        "insured": insured,
+        "portfolio": None,
+        "projection": None,
+        "investment_instruments": None,
+        "market_research": None,
+        "statement_path": pdf_path,
+        "run_id": run_id
+    }
@@ -0,0 +1,142 @@
+# -------------------------------
+# LLM RESPONSE CACHE
+# -------------------------------
+# Wraps the chat model so identical prompts are answered from the local cache.
+# Key = model + temperature + bound tools/tool_choice + normalized message list.
+import hashlib
+import json
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional
+
+from langchain_core.messages import (AIMessage, AIMessageChunk, BaseMessage, BaseMessageChunk,
+                                     messages_from_dict, messages_to_dict)
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.helpers.llm_guard import UNWRAPPED_CALLS, batch_invoke
+from src.helpers.sqlite_cache import SQLiteCache
+from src.logger import log
+from src.metrics import metrics
+
+
+def _normalize_message(message: BaseMessage) -> dict:
+    # Tool-call ids are generated per request, so they are left out of the key
+    return {
+        "type": message.type,
+        "content": message.content.strip() if isinstance(message.content, str) else message.content,
+        "tool_calls": [
+            {"name": tc["name"], "args": tc["args"]}
+            for tc in (getattr(message, "tool_calls", None) or [])
+        ]
+    }
+
+
+class CachedChatModel:
+    def __init__(self, model, cache: SQLiteCache, runnable=None, tools_key: Optional[list] = None):
+        self.model = model
+        self.cache = cache
+        self._runnable = runnable or model
+        self._tools_key = tools_key or []
+
+    def bind_tools(self, tools: list, **kwargs) -> "CachedChatModel":
+        tools_key = [convert_to_openai_tool(t) for t in tools]
+        tools_key.append({"bind_kwargs": kwargs})
+        return CachedChatModel(self.model, self.cache, self.model.bind_tools(tools, **kwargs), tools_key)
+
+    def cache_key(self, messages: List[BaseMessage]) -> str:
+        payload = {
+            "model": getattr(self.model, "model_name", None) or getattr(self.model, "model", None),
+            "temperature": getattr(self.model, "temperature", None),
+            "tools": self._tools_key,
+            "messages": [_normalize_message(m) for m in messages]
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _count_hit(self):
+        model = getattr(self.model, "model_name", None) or getattr(self.model, "model", None)
+        metrics.inc("llm_calls_total", labels={"model": model, "source": "cache", "status": "ok"})
+
+    def _lookup(self, key: str, validate: Optional[Callable[[BaseMessage], bool]]) -> Optional[BaseMessage]:
+        """Cached reply, or None on a miss; an entry `validate` rejects is dropped so it is asked again."""
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        message = messages_from_dict(json.loads(cached))[0]
+        if validate is not None and not validate(message):
+            log.debug("LLM cache entry rejected", {"key": key[:12]})
+            self.cache.delete(key)
+            return None
+        log.debug("LLM cache hit", {"key": key[:12]})
+        self._count_hit()
+        return message
+
+    def _store(self, key: str, message: BaseMessage, validate: Optional[Callable[[BaseMessage], bool]]):
+        if validate is None or validate(message):
+            # A fresh id per use keeps add_messages from merging two runs' replies
+            stored = message.model_copy(update={"id": None})
+            self.cache.set(key, json.dumps(messages_to_dict([stored]), ensure_ascii=False))
+
+    def invoke(self, messages: List[BaseMessage], *args,
+               validate: Optional[Callable[[BaseMessage], bool]] = None, **kwargs):
+        """`validate` rejects unusable replies: a rejected cache entry is dropped and asked
+        again, and a rejected fresh reply is returned but not stored, so retries reach the model."""
+        key = self.cache_key(messages)
+        cached = self._lookup(key, validate)
+        if cached is not None:
+            return cached
+        response = self._runnable.invoke(messages, *args, **kwargs)
+        self._store(key, response, validate)
+        return response
+
+    async def ainvoke(self, messages: List[BaseMessage], *args,
+                      validate: Optional[Callable[[BaseMessage], bool]] = None, **kwargs):
+        key = self.cache_key(messages)
+        cached = self._lookup(key, validate)
+        if cached is not None:
+            return cached
+        response = await self._runnable.ainvoke(messages, *args, **kwargs)
+        self._store(key, response, validate)
+        return response
+
+    def batch(self, inputs: List[List[BaseMessage]], config=None, **kwargs) -> list:
+        return batch_invoke(self.invoke, inputs, config, **kwargs)
+
+    def stream(self, messages: List[BaseMessage], *args,
+               validate: Optional[Callable[[BaseMessage], bool]] = None, **kwargs) -> Iterator[BaseMessageChunk]:
+        """Yield chunks as they arrive; a cache hit comes back as one chunk, a miss is stored once complete."""
+        key = self.cache_key(messages)
+        cached = self._lookup(key, validate)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content, response_metadata=cached.response_metadata)
+            return
+
+        full = None
+        for chunk in self._runnable.stream(messages, *args, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield chunk
+        if full is not None:
+            self._store(key, AIMessage(content=full.content, response_metadata=full.response_metadata), validate)
+
+    async def astream(self, messages: List[BaseMessage], *args,
+                      validate: Optional[Callable[[BaseMessage], bool]] = None,
+                      **kwargs) -> AsyncIterator[BaseMessageChunk]:
+        key = self.cache_key(messages)
+        cached = self._lookup(key, validate)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content, response_metadata=cached.response_metadata)
+            return
+
+        full = None
+        async for chunk in self._runnable.astream(messages, *args, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield chunk
+        if full is not None:
+            self._store(key, AIMessage(content=full.content, response_metadata=full.response_metadata), validate)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+    def __getattr__(self, name: str) -> Any:
+        # Other ways of running the model would skip the cache and the bound tools
+        if name == "model" or name in UNWRAPPED_CALLS:
+            raise AttributeError(f"{type(self).__name__} does not support {name}")
+        return getattr(self.model, name)
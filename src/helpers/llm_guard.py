@@ -0,0 +1,109 @@
+# -------------------------------
+# GUARDED CHAT MODEL
+# -------------------------------
+# Routes every chat model request through a ProviderGuard (rate limits, retries,
+# circuit breaker). Sits under CachedChatModel, so cache hits never wait.
+#
+# Client contract shared by every wrapper returned from get_llm_client():
+#   invoke(messages, validate=None) - `validate(reply) -> bool` marks unusable replies;
+#   layers that store replies must not keep (or serve) one it rejects, the others ignore it.
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Iterator, List
+
+from langchain_core.messages import BaseMessage, BaseMessageChunk
+
+from src.helpers.provider_guard import ProviderGuard
+from src.utils import count_messages_tokens
+
+
+# Runnable entry points the wrappers do not implement. Falling through __getattr__ would run
+# the unwrapped (and, after bind_tools, unbound) model, so they raise AttributeError instead.
+UNWRAPPED_CALLS = frozenset({
+    "abatch", "batch_as_completed", "abatch_as_completed", "astream_events", "astream_log",
+    "transform", "atransform", "pipe", "with_retry", "with_fallbacks", "with_config"
+})
+
+
+def batch_invoke(invoke, inputs: list, config=None, **kwargs) -> list:
+    """Runnable.batch over a wrapper's invoke(), so every input still goes through the wrapper."""
+    config = config if isinstance(config, dict) else {}
+    workers = max(1, min(len(inputs), config.get("max_concurrency") or 8))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda messages: invoke(messages, **kwargs), inputs))
+
+
+def _actual_tokens(message) -> int:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("total_tokens", 0)
+
+
+class GuardedChatModel:
+    def __init__(self, model, guard: ProviderGuard, runnable=None):
+        self.model = model
+        self.guard = guard
+        self._runnable = runnable or model
+
+    def bind_tools(self, tools: list, **kwargs) -> "GuardedChatModel":
+        return GuardedChatModel(self.model, self.guard, self.model.bind_tools(tools, **kwargs))
+
+    def invoke(self, messages: List[BaseMessage], *args, validate=None, **kwargs):
+        # validate is for storing layers (see the contract above); nothing is kept here
+        estimate = count_messages_tokens(messages)
+        response = self.guard.call(self._runnable.invoke, messages, *args, tokens=estimate, **kwargs)
+        # Charge whatever the provider reports beyond the estimate, so the TPM bucket tracks reality
+        self.guard.tokens.consume(_actual_tokens(response) - estimate)
+        return response
+
+    async def ainvoke(self, messages: List[BaseMessage], *args, validate=None, **kwargs):
+        estimate = count_messages_tokens(messages)
+        response = await self.guard.acall(self._runnable.ainvoke, messages, *args, tokens=estimate, **kwargs)
+        self.guard.tokens.consume(_actual_tokens(response) - estimate)
+        return response
+
+    def batch(self, inputs: List[List[BaseMessage]], config=None, **kwargs) -> list:
+        return batch_invoke(self.invoke, inputs, config, **kwargs)
+
+    def stream(self, messages: List[BaseMessage], *args, validate=None, **kwargs) -> Iterator[BaseMessageChunk]:
+        # Only opening the stream is guarded; a failure mid-stream is not retried
+        estimate = count_messages_tokens(messages)
+        chunks = self.guard.call(
+            lambda: _first_and_rest(self._runnable.stream(messages, *args, **kwargs)), tokens=estimate
+        )
+        for chunk in chunks:
+            yield chunk
+
+    async def astream(self, messages: List[BaseMessage], *args, validate=None,
+                      **kwargs) -> AsyncIterator[BaseMessageChunk]:
+        # As with stream(), only opening the stream is guarded
+        estimate = count_messages_tokens(messages)
+
+        async def first_and_rest():
+            stream = self._runnable.astream(messages, *args, **kwargs).__aiter__()
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            return first, stream
+
+        first, stream = await self.guard.acall(first_and_rest, tokens=estimate)
+        if first is not None:
+            yield first
+            async for chunk in stream:
+                yield chunk
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "model" or name in UNWRAPPED_CALLS:
+            raise AttributeError(f"{type(self).__name__} does not support {name}")
+        return getattr(self.model, name)
+
+
+def _first_and_rest(stream: Iterator) -> Iterator:
+    """Pull the first chunk eagerly, so connection / 429 errors surface inside the guard."""
+    first = next(stream, None)
+
+    def chain():
+        if first is not None:
+            yield first
+        yield from stream
+
+    return chain()
@@ -0,0 +1,54 @@
+# -------------------------------
+# LLM METRICS
+# -------------------------------
+# LangChain callback attached to the chat model: counts API calls, their latency
+# and the token usage the provider reports. Cache hits never reach the model and
+# are counted by CachedChatModel instead.
+import threading
+import time
+from typing import Any, Dict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.metrics import metrics
+
+
+def _usage(response: LLMResult) -> Dict[str, int]:
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return {"input": usage.get("input_tokens", 0), "output": usage.get("output_tokens", 0)}
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    return {"input": token_usage.get("prompt_tokens", 0), "output": token_usage.get("completion_tokens", 0)}
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._started: Dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs):
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+
+    def _finish(self, run_id: UUID, status: str):
+        with self._lock:
+            start = self._started.pop(run_id, None)
+        labels = {"model": self.model_name, "source": "api", "status": status}
+        metrics.inc("llm_calls_total", labels=labels)
+        if start is not None:
+            metrics.observe("llm_call_duration_seconds", time.perf_counter() - start,
+                            {"model": self.model_name, "status": status})
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        self._finish(run_id, "ok")
+        for kind, count in _usage(response).items():
+            if count:
+                metrics.inc("llm_tokens_total", count, {"model": self.model_name, "kind": kind})
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._finish(run_id, "error")
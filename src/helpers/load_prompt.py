@@ -1,7 +1,9 @@
 import os
+from functools import lru_cache
 
+@lru_cache(maxsize=None)
 def load_prompt(file_name: str) -> str:
-    """Loads a text prompt from the src/prompts directory."""
+    """Loads a text prompt from the src/prompts directory (read once per process)."""
     base_dir = os.path.join(os.path.dirname(__file__), "..", "prompts")
     file_path = os.path.join(base_dir, file_name)
     with open(file_path, "r", encoding="utf-8") as f:
@@ -1,6 +1,8 @@
 # src/helpers/pretty_print.py
 from datetime import datetime
 
+from src.helpers.recommendation_parser import parse_line
+
 def banner(text: str, char="=", length=70):
     print(f"\n{char * length}")
     print(f"{text.center(length)}")
@@ -29,16 +31,44 @@ def result_box(title: str, data: dict):
         print(f"   {k:<20}: {v}")
     print(f"{'='*60}\n")
 
-def stock_recommendation(stock_data: str):
-    lines = stock_data.strip().splitlines()
+def portfolio_box(title: str, portfolio):
+    """Render a PortfolioAllocation; the only place its amounts become ₹ strings."""
+    rows = {
+        "Equity (Stocks)": portfolio.equity,
+        "Bond Securities": portfolio.bonds,
+        "Emergency Fund": portfolio.emergency_fund,
+    }
+    if portfolio.insurance > 0:
+        rows["Insurance"] = portfolio.insurance
+    result_box(title, {k: money(v) for k, v in rows.items()})
+
+def projection_box(projection: dict):
+    """Render tools.portfolio_projection.projection_summary output."""
+    total = projection["final"]["total"]
+    result_box(f"PROJECTED WEALTH IN {projection['months'] // 12} YEARS", {
+        "Contributed": money(projection["contributed"]),
+        "Pessimistic (p10)": money(total["p10"]),
+        "Median (p50)": money(total["p50"]),
+        "Optimistic (p90)": money(total["p90"]),
+    })
+
+def recommendation_header():
     print(f"\n{'✨'*30}")
     print("    BEST STOCK RECOMMENDATION FOR YOU    ".center(60))
     print(f"{'✨'*30}\n")
-    for line in lines:
-        if "Stock:" in line or "Ticker:" in line:
-            print(f"   {line}")
-        elif "Price:" in line or "Shares:" in line or "Cost:" in line:
-            print(f"   {line}")
-        elif "Do you want to confirm" in line:
-            print(f"\n{line}")
+
+def recommendation_line(line: str):
+    """Render one recommendation line; used for both full and streamed replies."""
+    parsed = parse_line(line)
+    if parsed is None:
+        return
+    if parsed[0] == "question":
+        print(f"\n{line.strip()}", flush=True)
+    else:
+        print(f"   {line.strip()}", flush=True)
+
+def stock_recommendation(stock_data: str):
+    recommendation_header()
+    for line in stock_data.strip().splitlines():
+        recommendation_line(line)
     print()
\ No newline at end of file
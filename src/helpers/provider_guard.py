@@ -0,0 +1,288 @@
+# -------------------------------
+# PROVIDER GUARD
+# -------------------------------
+# Process-wide protection for upstream APIs (Groq, Tavily). Every call goes through:
+#   1. a circuit breaker  - fail fast while the provider is down
+#   2. token buckets      - requests/min and tokens/min shared by all runs in the process
+#   3. jittered retries   - only for 429 / 5xx / network errors, honouring Retry-After
+# A 429 with Retry-After pauses the whole provider, not just the caller that got it,
+# so concurrent runs back off together instead of retrying in lock-step.
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Tuple
+
+from src.config import (
+    GROQ_REQUESTS_PER_MIN, GROQ_TOKENS_PER_MIN, TAVILY_REQUESTS_PER_MIN,
+    PROVIDER_MAX_ATTEMPTS, PROVIDER_RETRY_BASE_S, PROVIDER_RETRY_MAX_S,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_S
+)
+from src.logger import log
+from src.metrics import metrics
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class TokenBucket:
+    """Reservation-based bucket: callers take tokens immediately (possibly into debt) and
+    are told how long to wait, so waiters are served in arrival order."""
+
+    def __init__(self, per_minute: Optional[float]):
+        self.capacity = float(per_minute or 0)
+        self.rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens and return the seconds to wait before using them."""
+        if self.capacity <= 0:
+            return 0.0
+        # A request larger than the bucket waits for a full bucket rather than forever
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def consume(self, amount: float):
+        """Charge tokens after the fact (actual usage above the estimate); never waits."""
+        if self.capacity <= 0 or amount <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures; after `reset_s` one
+    probe call is let through (half-open) and its outcome closes or re-opens the circuit."""
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_s: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_s:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        raise CircuitOpenError(f"{self.name} circuit is open; retry in {self.remaining_s():.0f}s")
+
+    def remaining_s(self) -> float:
+        return max(0.0, self.reset_s - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                log.info("Circuit closed", {"provider": self.name})
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    log.warning("Circuit opened", {"provider": self.name, "failures": self._failures})
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+def _parse_retry_after(value) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error: Exception) -> Tuple[bool, Optional[float]]:
+    """(retryable, retry_after_s) for an exception raised by a provider SDK."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = _parse_retry_after(headers.get("retry-after") if hasattr(headers, "get") else None)
+
+    if status is not None:
+        return status == 429 or status >= 500, retry_after
+    name = type(error).__name__
+    return isinstance(error, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connection" in name, retry_after
+
+
+class ProviderGuard:
+    def __init__(self, name: str, requests_per_min: Optional[float], tokens_per_min: Optional[float] = None,
+                 max_attempts: int = PROVIDER_MAX_ATTEMPTS, base_delay_s: float = PROVIDER_RETRY_BASE_S,
+                 max_delay_s: float = PROVIDER_RETRY_MAX_S, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_s: float = BREAKER_RESET_S):
+        self.name = name
+        self.requests = TokenBucket(requests_per_min)
+        self.tokens = TokenBucket(tokens_per_min)
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_s)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0,
+                       "waits": 0, "wait_s_total": 0.0, "wait_s_max": 0.0, "queue_depth": 0}
+
+    # --- waiting -------------------------------------------------------------
+    def _reserve(self, tokens: float) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens) if tokens else 0.0)
+        with self._lock:
+            wait = max(wait, self._paused_until - time.monotonic())
+            if wait > 0:
+                self._stats["waits"] += 1
+                self._stats["wait_s_total"] += wait
+                self._stats["wait_s_max"] = max(self._stats["wait_s_max"], wait)
+                self._stats["queue_depth"] += 1
+        if wait > 0:
+            metrics.observe("provider_wait_seconds", wait, {"provider": self.name})
+        return max(0.0, wait)
+
+    def _done_waiting(self, wait: float):
+        if wait > 0:
+            with self._lock:
+                self._stats["queue_depth"] -= 1
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter keeps concurrent retries from arriving together
+        delay = random.uniform(0, min(self.max_delay_s, self.base_delay_s * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay_s))
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+        if key in ("retries", "failures", "rejected"):
+            metrics.inc(f"provider_{key}_total", labels={"provider": self.name})
+
+    def _before_attempt(self):
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count("rejected")
+            raise
+        self._count("calls")
+
+    def _after_error(self, error: Exception, attempt: int) -> float:
+        """Delay before the next attempt; re-raises when the error is final."""
+        retryable, retry_after = classify_error(error)
+        if not retryable:
+            # The provider answered (e.g. 400): it is healthy, the request is not
+            self.breaker.record_success()
+            self._count("failures")
+            raise error
+        self.breaker.record_failure()
+        if attempt == self.max_attempts or self.breaker.state == CircuitBreaker.OPEN:
+            self._count("failures")
+            raise error
+        self._count("retries")
+        delay = self._backoff(attempt, retry_after)
+        log.warning("Provider call failed, retrying", {
+            "provider": self.name, "attempt": attempt, "delay_s": round(delay, 2),
+            "retry_after": retry_after, "error": str(error)[:200]
+        })
+        return delay
+
+    # --- sync / async entry points ----------------------------------------------
+    def call(self, fn: Callable, *args, tokens: float = 0, **kwargs):
+        for attempt in range(1, self.max_attempts + 1):
+            self._before_attempt()
+            wait = self._reserve(tokens)
+            try:
+                if wait:
+                    time.sleep(wait)
+            finally:
+                self._done_waiting(wait)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                time.sleep(self._after_error(e, attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, fn: Callable, *args, tokens: float = 0, **kwargs):
+        """Same as call() for coroutine functions; waits without blocking the event loop."""
+        for attempt in range(1, self.max_attempts + 1):
+            self._before_attempt()
+            wait = self._reserve(tokens)
+            try:
+                if wait:
+                    await asyncio.sleep(wait)
+            finally:
+                self._done_waiting(wait)
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                await asyncio.sleep(self._after_error(e, attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["wait_s_total"] = round(stats["wait_s_total"], 3)
+        stats["wait_s_max"] = round(stats["wait_s_max"], 3)
+        stats["circuit"] = self.breaker.state
+        return stats
+
+
+groq_guard = ProviderGuard("groq", GROQ_REQUESTS_PER_MIN, GROQ_TOKENS_PER_MIN)
+tavily_guard = ProviderGuard("tavily", TAVILY_REQUESTS_PER_MIN)
+
+
+def provider_stats() -> dict:
+    return {guard.name: guard.stats() for guard in (groq_guard, tavily_guard)}
+
+
+def _provider_gauges():
+    states = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+    for guard in (groq_guard, tavily_guard):
+        stats = guard.stats()
+        labels = {"provider": guard.name}
+        yield "provider_queue_depth", labels, stats["queue_depth"]
+        yield "provider_circuit_state", labels, states[stats["circuit"]]
+
+
+metrics.describe("provider_wait_seconds", "Time a call waited for the rate limiter")
+metrics.describe("provider_retries_total", "Provider calls retried after 429 / 5xx / network errors")
+metrics.describe("provider_failures_total", "Provider calls that failed for good")
+metrics.describe("provider_rejected_total", "Calls rejected by an open circuit")
+metrics.describe("provider_queue_depth", "Calls currently waiting for the rate limiter")
+metrics.describe("provider_circuit_state", "0 = closed, 1 = half open, 2 = open")
+metrics.register_collector(_provider_gauges)
@@ -0,0 +1,110 @@
+# -------------------------------
+# RECOMMENDATION PARSER
+# -------------------------------
+# Incremental parser for the stock picker's fixed-format answer
+# (see prompts/user_prompt_inst_picker.txt). Text is fed as tokens arrive;
+# every completed line is parsed at once, so checks on price, shares and cost
+# can run before the model has finished the reply.
+import re
+from dataclasses import dataclass, fields
+from typing import List, Optional, Tuple
+
+AMOUNT = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+# label prefix (lower-case, without markdown) -> (field, is_number)
+FIELD_LABELS = {
+    "stock name": ("stock_name", False),
+    "stock": ("stock_name", False),
+    "ticker": ("ticker", False),
+    "current price": ("price", True),
+    "price": ("price", True),
+    "number of shares": ("shares", True),
+    "shares": ("shares", True),
+    "total cost": ("total_cost", True),
+    "cost": ("total_cost", True),
+}
+
+
+@dataclass
+class Recommendation:
+    stock_name: Optional[str] = None
+    ticker: Optional[str] = None
+    price: Optional[float] = None
+    shares: Optional[int] = None
+    total_cost: Optional[float] = None
+    question: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        return all(getattr(self, f.name) is not None for f in fields(self) if f.name != "question")
+
+
+def _parse_amount(text: str) -> Optional[float]:
+    match = AMOUNT.search(text)
+    return float(match.group().replace(",", "")) if match else None
+
+
+def parse_line(line: str) -> Optional[Tuple[str, object]]:
+    """(field, value) for one recommendation line, or None if the line is not a field."""
+    clean = line.strip().strip("*-• ").replace("**", "")
+    if clean.lower().startswith("do you want to confirm"):
+        return "question", clean
+    label, sep, value = clean.partition(":")
+    if not sep:
+        return None
+    spec = FIELD_LABELS.get(label.strip().lower())
+    if spec is None:
+        return None
+    name, is_number = spec
+    value = value.strip()
+    if not is_number:
+        return (name, value) if value else None
+    amount = _parse_amount(value)
+    if amount is None:
+        return None
+    return name, int(amount) if name == "shares" else amount
+
+
+class RecommendationParser:
+    """Feed streamed text; each call returns the lines completed by that chunk as (line, field)."""
+
+    def __init__(self):
+        self.result = Recommendation()
+        self._buffer = ""
+
+    def _consume(self, line: str) -> Tuple[str, Optional[Tuple[str, object]]]:
+        parsed = parse_line(line)
+        if parsed is not None:
+            setattr(self.result, parsed[0], parsed[1])
+        return line, parsed
+
+    def feed(self, text: str) -> List[Tuple[str, Optional[Tuple[str, object]]]]:
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        return [self._consume(line) for line in lines]
+
+    def close(self) -> List[Tuple[str, Optional[Tuple[str, object]]]]:
+        """Flush the last line (replies rarely end with a newline)."""
+        line, self._buffer = self._buffer, ""
+        return [self._consume(line)] if line.strip() else []
+
+
+def parse_recommendation(text: str) -> Recommendation:
+    parser = RecommendationParser()
+    parser.feed(text)
+    parser.close()
+    return parser.result
+
+
+def format_recommendation(rec: Recommendation) -> str:
+    """Render a Recommendation in the prompt's answer format (the inverse of parse_recommendation)."""
+    price, total = f"₹{rec.price:,.2f}", f"₹{rec.total_cost:,.2f}"
+    return "\n".join([
+        f"Stock name: {rec.stock_name}",
+        f"Ticker: {rec.ticker}",
+        f"Current price: {price}",
+        f"Number of shares: {rec.shares}",
+        f"Total cost: {total}",
+        "",
+        f"Do you want to confirm buying {rec.shares} shares of {rec.stock_name} at {price} per share (total ≈ {total})?"
+    ])
@@ -0,0 +1,192 @@
+# -------------------------------
+# STATEMENT PARSER
+# -------------------------------
+# Rule-based parser for the text returned by pdf_reader_tool.
+# Handles both narrative statements ("Received salary Rs.50000") and
+# tabular bank exports (date | description | debit | credit | balance).
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+DATE_PATTERN = re.compile(
+    r"\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}"
+    r"|\d{4}-\d{2}-\d{2}"
+    r"|\d{1,2}[\s-](?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*[\s-]\d{2,4}"
+    r"|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s\d{1,2},?\s\d{4})\b",
+    re.I
+)
+CURRENCY_AMOUNT = re.compile(r"(?:rs\.?|inr|₹)\s*(\d[\d,]*(?:\.\d{1,2})?)", re.I)
+DECIMAL_AMOUNT = re.compile(r"(?<![\d.])(\d{1,3}(?:,\d{2,3})+(?:\.\d{1,2})?|\d+\.\d{2})(?![\d.])")
+PLAIN_NUMBER = re.compile(r"(?<![\w.,/-])(\d[\d,]*)(?![\w.,/-])")
+
+CREDIT_WORDS = re.compile(
+    r"\b(cr|credit(?:ed)?|received|salary|deposit\w*|refund\w*|interest|cashback|dividend\w*|reversal)\b", re.I
+)
+DEBIT_WORDS = re.compile(
+    r"\b(dr|debit(?:ed)?|sent|spent|paid|withdrawal?|purchase\w*|rent|bills?|emi|atm|fees?|charges?)\b", re.I
+)
+# Explicit outgoing verbs: they settle lines that also mention a credit word
+# ("Paid credit card bill", "Loan interest paid")
+DEBIT_VERBS = re.compile(r"\b(paid|debited|sent|spent|withdrawn)\b", re.I)
+SUMMARY_WORDS = ("balance", "total", "opening", "closing", "summary", "statement period", "page")
+
+
+@dataclass
+class Transaction:
+    date: Optional[str]
+    description: str
+    direction: str  # "credit" or "debit"
+    amount: float
+
+
+@dataclass
+class ParsedStatement:
+    transactions: List[Transaction] = field(default_factory=list)
+    income: float = 0.0
+    expenses: float = 0.0
+    savings: float = 0.0
+    confidence: float = 0.0
+    unparsed_lines: int = 0
+
+
+def _to_float(raw: str) -> float:
+    return float(raw.replace(",", ""))
+
+
+def _find_amounts(line: str) -> List[float]:
+    """Amounts in a line, most trustworthy notation first (₹/Rs prefix, then decimals, then bare numbers)."""
+    without_dates = DATE_PATTERN.sub(" ", line)
+    for pattern in (CURRENCY_AMOUNT, DECIMAL_AMOUNT, PLAIN_NUMBER):
+        found = [_to_float(m) for m in pattern.findall(without_dates)]
+        if found:
+            return found
+    return []
+
+
+def _direction_from_text(line: str) -> Optional[str]:
+    """Credit / debit from the wording; None when it is ambiguous, so the line lowers confidence.
+
+    >>> _direction_from_text("Paid credit card bill Rs.5000")
+    'debit'
+    >>> _direction_from_text("Loan interest paid Rs 1200")
+    'debit'
+    >>> _direction_from_text("Credit card purchase Rs 800") is None
+    True
+    >>> _direction_from_text("Salary received Rs.50000")
+    'credit'
+    """
+    credit = CREDIT_WORDS.search(line)
+    debit = DEBIT_WORDS.search(line)
+    if credit and debit:
+        return "debit" if DEBIT_VERBS.search(line) else None
+    if credit:
+        return "credit"
+    if debit:
+        return "debit"
+    return None
+
+
+def split_statement(text: str, max_chars: int) -> List[str]:
+    """Split statement text into chunks of at most ~max_chars, breaking only between lines.
+
+    Once a chunk is 80% full, it is closed early at the next line that starts with a date,
+    so a transaction row and its wrapped continuation lines stay together.
+    """
+    chunks, current, size = [], [], 0
+    for line in text.splitlines(keepends=True):
+        starts_with_date = DATE_PATTERN.match(line.strip()) is not None
+        if current and (size + len(line) > max_chars or (size >= 0.8 * max_chars and starts_with_date)):
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+class StatementParser:
+    """Incremental parse_statement: feed() text in pieces (e.g. PDF pages as they are
+    extracted) and close() for the result. Lines are split exactly as if the pieces had
+    been joined first, so a line running across two pages is parsed once, whole.
+    """
+
+    def __init__(self):
+        self.result = ParsedStatement()
+        self._previous_balance: Optional[float] = None
+        self._candidates = 0
+        self._partial = ""
+
+    def feed(self, text: str):
+        if not text:
+            return
+        lines = (self._partial + text).splitlines(keepends=True)
+        # The last line is held back until a later piece (or close()) ends it
+        last = lines[-1]
+        self._partial = lines.pop() if last.splitlines()[0] == last else ""
+        for line in lines:
+            self._parse_line(line)
+
+    def close(self) -> ParsedStatement:
+        if self._partial:
+            self._parse_line(self._partial)
+            self._partial = ""
+        result = self.result
+        result.income = sum(t.amount for t in result.transactions if t.direction == "credit")
+        result.expenses = sum(t.amount for t in result.transactions if t.direction == "debit")
+        result.savings = max(0.0, result.income - result.expenses)
+        result.confidence = len(result.transactions) / self._candidates if self._candidates else 0.0
+        return result
+
+    def _parse_line(self, raw_line: str):
+        line = " ".join(raw_line.split())
+        if not line:
+            return
+
+        lowered = line.lower()
+        amounts = _find_amounts(line)
+        if not amounts:
+            return
+
+        date_match = DATE_PATTERN.search(line)
+        if any(w in lowered for w in SUMMARY_WORDS) and not date_match:
+            # Opening/closing balance rows anchor the running balance but are not transactions
+            if "balance" in lowered:
+                self._previous_balance = amounts[-1]
+            return
+
+        self._candidates += 1
+        direction = _direction_from_text(line)
+        amount = amounts[0]
+
+        # Tabular rows: "... <amount> <balance>" — the running balance settles the direction
+        if date_match and len(amounts) >= 2:
+            balance = amounts[-1]
+            amount = amounts[-2]
+            if self._previous_balance is not None and balance != self._previous_balance:
+                direction = "credit" if balance > self._previous_balance else "debit"
+            self._previous_balance = balance
+
+        if direction is None or amount <= 0:
+            self.result.unparsed_lines += 1
+            return
+
+        description = DATE_PATTERN.sub("", line).strip(" |-")
+        self.result.transactions.append(Transaction(
+            date=date_match.group(1) if date_match else None,
+            description=description,
+            direction=direction,
+            amount=amount
+        ))
+
+
+def parse_statement(text: str) -> ParsedStatement:
+    """Turn statement text into transactions and compute income, expenses and savings.
+
+    `confidence` is the share of amount-bearing lines that were classified as a
+    credit or debit; callers fall back to the LLM when it is low.
+    """
+    parser = StatementParser()
+    parser.feed(text)
+    return parser.close()
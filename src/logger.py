@@ -1,12 +1,79 @@
 # src/logger.py
+import atexit
 import logging
+import queue
+import threading
 import time
 import json
-from typing import Any, Dict, Optional
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional, Union
+from functools import wraps
 from pathlib import Path
 
+from src.config import LOG_LEVEL, LOG_DIR
+from src.metrics import metrics
+
+Payload = Union[Dict[str, Any], Callable[[], Dict[str, Any]], None]
+
+# Set by time_node for the duration of a node call; attached to every record
+current_run_id: ContextVar[Optional[str]] = ContextVar("current_run_id", default=None)
+current_node: ContextVar[Optional[str]] = ContextVar("current_node", default=None)
+
+
+def _is_graph_interrupt(error: Exception) -> bool:
+    # Imported lazily: langgraph is heavy and the logger is loaded by every module
+    from langgraph.errors import GraphBubbleUp
+    return isinstance(error, GraphBubbleUp)
+
+
+def _record_node(node_name: str, status: str, duration: float):
+    metrics.observe("node_duration_seconds", duration, {"node": node_name})
+    metrics.inc("node_calls_total", labels={"node": node_name, "status": status})
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Human-readable line; the payload is appended as JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        payload = getattr(record, "payload", None)
+        return f"{line} | {json.dumps(payload, ensure_ascii=False, default=str)}" if payload else line
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line with run / node correlation fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": f"{self.formatTime(record, '%Y-%m-%dT%H:%M:%S')}.{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "node": getattr(record, "node", None),
+            "thread": record.threadName
+        }
+        payload = getattr(record, "payload", None)
+        if payload:
+            entry["data"] = payload
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # The stock prepare() formats the record on the calling thread; leave that to the listener
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
 
 class AgentLogger:
+    """Logging facade: callers only enqueue records; a background listener formats and writes them.
+
+    `extra` may be a dict or a zero-argument callable returning one; it is only evaluated when
+    the level is enabled and only serialized on the listener thread.
+    """
     _instance = None
 
     def __new__(cls):
@@ -19,76 +86,127 @@ class AgentLogger:
         if self._initialized:
             return
 
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-
         self.logger = logging.getLogger("FinanceAgent")
-        self.logger.setLevel(logging.DEBUG)
+        self.logger.setLevel(LOG_LEVEL)
+        self._listener: Optional[QueueListener] = None
+        self._console: Optional[logging.Handler] = None
+        self._handlers_ready = False
+        self._handlers_lock = threading.Lock()
+        self._initialized = True
+
+    def _ensure_handlers(self):
+        """Create logs/ and start the listener on the first log call, not at import."""
+        if self._handlers_ready:
+            return
+        with self._handlers_lock:
+            if self._handlers_ready:
+                return
+            self._configure_handlers()
+            self._handlers_ready = True
+        self.logger.info("AgentLogger initialized")
 
-        formatter = logging.Formatter(
+    def _configure_handlers(self):
+        log_dir = Path(LOG_DIR)
+        log_dir.mkdir(parents=True, exist_ok=True)
+
+        # Console handler
+        self._console = logging.StreamHandler()
+        self._console.setLevel(logging.INFO)
+        self._console.setFormatter(ConsoleFormatter(
             fmt="%(asctime)s | %(levelname)8s | %(name)s | %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S"
-        )
+        ))
 
-        # Console handler
-        ch = logging.StreamHandler()
-        ch.setLevel(logging.INFO)
-        ch.setFormatter(formatter)
+        # File handler (JSON lines, everything the logger level lets through)
+        fh = logging.FileHandler(log_dir / "agent.jsonl", encoding="utf-8")
+        fh.setFormatter(JsonLinesFormatter())
 
-        # File handler (detailed)
-        fh = logging.FileHandler(log_dir / "agent.log", encoding="utf-8")
-        fh.setLevel(logging.DEBUG)
-        fh.setFormatter(formatter)
+        records = queue.SimpleQueue()
+        self._listener = QueueListener(records, self._console, fh, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self.shutdown)
 
         self.logger.handlers.clear()
-        self.logger.addHandler(ch)
-        self.logger.addHandler(fh)
+        self.logger.addHandler(_DeferredQueueHandler(records))
 
-        self._initialized = True
-        self.logger.info("AgentLogger initialized")
+    def set_console_level(self, level: int):
+        self._ensure_handlers()
+        self._console.setLevel(level)
+
+    def shutdown(self):
+        """Drain the queue and stop the listener thread (also registered with atexit)."""
+        with self._handlers_lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener = None
 
-    def info(self, msg: str, extra: Optional[Dict[str, Any]] = None):
+    def info(self, msg: str, extra: Payload = None):
         self._log(logging.INFO, msg, extra)
 
-    def error(self, msg: str, extra: Optional[Dict[str, Any]] = None):
+    def error(self, msg: str, extra: Payload = None):
         self._log(logging.ERROR, msg, extra)
 
-    def warning(self, msg: str, extra: Optional[Dict[str, Any]] = None):
+    def warning(self, msg: str, extra: Payload = None):
         self._log(logging.WARNING, msg, extra)
 
-    def debug(self, msg: str, extra: Optional[Dict[str, Any]] = None):
+    def debug(self, msg: str, extra: Payload = None):
         self._log(logging.DEBUG, msg, extra)
 
-    def _log(self, level: int, msg: str, extra: Optional[Dict[str, Any]]):
-        extra = extra or {}
-        extra_str = " | " + json.dumps(extra, ensure_ascii=False) if extra else ""
-        self.logger.log(level, msg + extra_str)
+    def _log(self, level: int, msg: str, extra: Payload):
+        if not self.logger.isEnabledFor(level):
+            return
+        self._ensure_handlers()
+        if callable(extra):
+            extra = extra()
+        self.logger.log(level, msg, extra={
+            # Shallow copy: the dict is serialized later, on the listener thread
+            "payload": dict(extra) if extra else None,
+            "run_id": current_run_id.get(),
+            "node": current_node.get()
+        })
 
     def time_node(self, node_name: str):
         """Decorator for timing node execution"""
 
         def decorator(func):
+            @wraps(func)
             def wrapper(state, *args, **kwargs):
                 start = time.perf_counter()
-                node_id = extra.get("run_id", "unknown") if (extra := state.get("metadata", {})) else "unknown"
+                run_id = state.get("run_id") or "unknown"
+                run_token = current_run_id.set(run_id)
+                node_token = current_node.set(node_name)
                 try:
                     result = func(state, *args, **kwargs)
                     duration = time.perf_counter() - start
+                    _record_node(node_name, "ok", duration)
                     self.info("Node completed", {
                         "node": node_name,
                         "duration_ms": round(duration * 1000, 2),
-                        "run_id": node_id
+                        "run_id": run_id
                     })
                     return result
                 except Exception as e:
                     duration = time.perf_counter() - start
+                    if _is_graph_interrupt(e):
+                        # interrupt() raises to park the run; that is not a failure
+                        _record_node(node_name, "interrupted", duration)
+                        self.info("Node interrupted", {
+                            "node": node_name,
+                            "duration_ms": round(duration * 1000, 2),
+                            "run_id": run_id
+                        })
+                        raise
+                    _record_node(node_name, "error", duration)
                     self.error("Node failed", {
                         "node": node_name,
                         "duration_ms": round(duration * 1000, 2),
                         "error": str(e),
-                        "run_id": node_id
+                        "run_id": run_id
                     })
                     raise
+                finally:
+                    current_node.reset(node_token)
+                    current_run_id.reset(run_token)
 
             return wrapper
 
@@ -3,41 +3,39 @@
 # -------------------------------
 import uuid
 
-from langchain_core.messages import SystemMessage, HumanMessage
-
+from src.config import METRICS_PATH
 from src.helpers.pretty_print import banner
-from src.logger import log
+from src.metrics import metrics
 
 from src.graph.graph_creation import create_agent
-from src.helpers.load_prompt import load_prompt
+from src.graph.checkpointing import sqlite_checkpointer, run_config
+from src.helpers.initial_state import build_initial_state
+from src.helpers.confirmation import pending_confirmation, resume_with_decision
 
 
 
 
 if __name__ == "__main__":
-    print("LLM initialized with model: llama-3.3-70b-versatile")
     print("Running integrated agent...\n")
 
     banner("MONTHLY STOCK PICKER v1.0", "=", 70)
-    agent = create_agent()
+    thread_id = str(uuid.uuid4())[:8]
 
-    system_prompt = load_prompt("system_prompt_transaction_analyzer.txt")
-    user_prompt = load_prompt("user_prompt_transaction_analyzer.txt")
-    human_prompt = user_prompt.format(test_pdf = "data/transactions_november.pdf")
-    initial_state = {
-        "messages": [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=human_prompt)
-        ],
-        "total_savings": None,
-        "user_age": 35,
-        "insured": False,
-        "portfolio": None,
-        "investment_instruments": None
-    }
+    initial_state = build_initial_state("data/transactions_november.pdf", user_age=35, insured=False,
+                                        run_id=thread_id)
 
     print("🤖 Running integrated agent...\n")
-    result = agent.invoke(initial_state)
+    print(f"Run id: {thread_id} (resume with: python -m src.resume {thread_id})\n")
+    with sqlite_checkpointer() as checkpointer:
+        agent = create_agent(checkpointer=checkpointer)
+        result = agent.invoke(initial_state, run_config(thread_id))
+
+        # The graph parks at the confirmation interrupt; the terminal answers it here
+        pending = pending_confirmation(agent, thread_id)
+        if pending:
+            decision = input(f"\n{pending['question']}: ").strip().lower()
+            result = resume_with_decision(agent, thread_id, decision)
+    metrics.write_prometheus(METRICS_PATH)
     print("------Thank you------")
     print("Agent finished. Have a great investing month!".center(70))
     print("Thank you".center(70, " "))
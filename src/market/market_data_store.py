@@ -0,0 +1,393 @@
+# -------------------------------
+# MARKET DATA STORE
+# -------------------------------
+# Columnar daily OHLCV for NSE/BSE tickers, built offline from CSV dumps and read
+# through memory maps, so opening a store costs the same for 50 or 50,000 tickers
+# and only the pages a lookup touches are ever read.
+#
+#   python -m src.market.market_data_store build bhavcopy/*.csv --out data/market_store
+#   python -m src.market.market_data_store show INFY
+#
+# Layout (one .npy file per column):
+#   tickers.npy    S16, sorted            -> binary search by ticker
+#   offsets.npy    int64, len(tickers)+1  -> rows of ticker i are offsets[i]:offsets[i+1]
+#   lot_sizes.npy  int32 per ticker
+#   dates.npy      int32 days since 1970-01-01, sorted within each ticker
+#   open / high / low / close.npy  float64,  volume.npy  int64
+#
+# `out` is a symlink to the current build (<out>.<build id>); a rebuild writes a new
+# directory and repoints the link in one rename, so readers never see a missing store.
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from src.config import MARKET_DATA_DIR
+from src.logger import log
+
+TICKER_WIDTH = 16
+PRICE_COLUMNS = ("open", "high", "low", "close")
+STORE_VERSION = 1
+BUILD_ID_CHARS = 12
+
+# Accepted CSV headers (lower-case) for each column; NSE/BSE bhavcopy names included
+COLUMN_ALIASES = {
+    "ticker": ("ticker", "symbol", "tckrsymb", "sc_code"),
+    "date": ("date", "timestamp", "traddt", "trade_date"),
+    "open": ("open", "open_price", "opnpric"),
+    "high": ("high", "high_price", "hghpric"),
+    "low": ("low", "low_price", "lwpric"),
+    "close": ("close", "close_price", "clspric"),
+    "volume": ("volume", "tottrdqty", "ttltradgvol", "no_of_shrs"),
+    "lot_size": ("lot_size", "market_lot", "newbrdlotqty"),
+    "series": ("series", "sctysrs"),
+}
+# Equity series kept when the dump has a series column (derivatives, bonds etc. are dropped)
+EQUITY_SERIES = {"EQ", "BE", "BZ", "A", "B"}
+DATE_FORMATS = ("%Y-%m-%d", "%d-%b-%Y", "%d-%m-%Y", "%Y%m%d", "%d/%m/%Y")
+
+DateLike = Union[date, datetime, str, None]
+
+
+@dataclass(slots=True)
+class Bar:
+    ticker: str
+    date: date
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+
+
+def normalize_ticker(ticker: str) -> str:
+    """'NSE:INFY', 'infy.ns' and ' INFY ' all become 'INFY'."""
+    symbol = str(ticker).strip().upper()
+    for prefix in ("NSE:", "BSE:"):
+        if symbol.startswith(prefix):
+            symbol = symbol[len(prefix):]
+    for suffix in (".NS", ".BO"):
+        if symbol.endswith(suffix):
+            symbol = symbol[:-len(suffix)]
+    return symbol
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str) -> date:
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value!r}")
+
+
+def _day_number(value: DateLike) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    elif isinstance(value, str):
+        value = _parse_date(value)
+    return value.toordinal() - date(1970, 1, 1).toordinal()
+
+
+def _from_day_number(days: int) -> date:
+    return date.fromordinal(int(days) + date(1970, 1, 1).toordinal())
+
+
+class MarketDataStore:
+    """Read-only view over a built store; every column stays memory-mapped."""
+
+    def __init__(self, path: Union[str, Path]):
+        # Resolved once, so a rebuild swapping the link mid-open cannot mix two builds
+        self.path = Path(path).resolve()
+        self.meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        if self.meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported market data store version: {self.meta.get('version')}")
+
+        def column(name: str) -> np.ndarray:
+            # Plain ndarray view over the map: same pages, without np.memmap's per-call overhead
+            return np.asarray(np.load(self.path / f"{name}.npy", mmap_mode="r"))
+
+        self._tickers = column("tickers")
+        self._offsets = column("offsets")
+        self._lot_sizes = column("lot_sizes")
+        self._dates = column("dates")
+        self._columns = {name: column(name) for name in (*PRICE_COLUMNS, "volume")}
+
+    def __len__(self) -> int:
+        return int(self._tickers.shape[0])
+
+    def __contains__(self, ticker: str) -> bool:
+        return self._index(ticker) >= 0
+
+    @property
+    def rows(self) -> int:
+        return int(self._dates.shape[0])
+
+    def tickers(self) -> List[str]:
+        return [t.decode("ascii") for t in self._tickers]
+
+    def column(self, name: str) -> np.ndarray:
+        """Raw mapped column for vectorized readers: tickers, offsets, lot_sizes, dates, open ... volume."""
+        fixed = {"tickers": self._tickers, "offsets": self._offsets, "lot_sizes": self._lot_sizes, "dates": self._dates}
+        return fixed[name] if name in fixed else self._columns[name]
+
+    def _index(self, ticker: str) -> int:
+        key = normalize_ticker(ticker).encode("ascii", "ignore")
+        if not key or len(key) > TICKER_WIDTH:
+            return -1
+        i = int(self._tickers.searchsorted(key))
+        return i if i < self._tickers.shape[0] and self._tickers[i] == key else -1
+
+    def _row(self, i: int, on: DateLike) -> int:
+        """Row of ticker i's latest bar on or before `on` (latest overall when None), or -1."""
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        day = _day_number(on)
+        if day is not None:
+            end = start + int(np.searchsorted(self._dates[start:end], day, side="right"))
+        return end - 1 if end > start else -1
+
+    def lot_size(self, ticker: str) -> Optional[int]:
+        i = self._index(ticker)
+        return int(self._lot_sizes[i]) if i >= 0 else None
+
+    def bar(self, ticker: str, on: DateLike = None) -> Optional[Bar]:
+        """Latest bar on or before `on` (the latest available when `on` is None)."""
+        i = self._index(ticker)
+        row = self._row(i, on) if i >= 0 else -1
+        if row < 0:
+            return None
+        c = self._columns
+        return Bar(
+            ticker=self._tickers[i].decode("ascii"),
+            date=_from_day_number(self._dates[row]),
+            open=float(c["open"][row]),
+            high=float(c["high"][row]),
+            low=float(c["low"][row]),
+            close=float(c["close"][row]),
+            volume=int(c["volume"][row])
+        )
+
+    def close(self, ticker: str, on: DateLike = None) -> Optional[float]:
+        i = self._index(ticker)
+        row = self._row(i, on) if i >= 0 else -1
+        return float(self._columns["close"][row]) if row >= 0 else None
+
+    def history(self, ticker: str, start: DateLike = None, end: DateLike = None) -> Optional[Dict[str, np.ndarray]]:
+        """Read-only column slices (dates as datetime64[D]) between `start` and `end`, inclusive."""
+        i = self._index(ticker)
+        if i < 0:
+            return None
+        lo, hi = int(self._offsets[i]), int(self._offsets[i + 1])
+        dates = self._dates[lo:hi]
+        first = _day_number(start)
+        last = _day_number(end)
+        a = int(np.searchsorted(dates, first, side="left")) if first is not None else 0
+        b = int(np.searchsorted(dates, last, side="right")) if last is not None else hi - lo
+        out = {name: col[lo + a:lo + b] for name, col in self._columns.items()}
+        out["date"] = dates[a:b].astype("datetime64[D]")
+        return out
+
+
+# -------------------------------
+# BUILDING FROM CSV
+# -------------------------------
+def _resolve_columns(header: List[str]) -> Dict[str, int]:
+    lowered = [h.strip().lower() for h in header]
+    found = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lowered:
+                found[column] = lowered.index(alias)
+                break
+    missing = {"ticker", "date", "close"} - found.keys()
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(sorted(missing))}")
+    return found
+
+
+def _read_csv(path: Union[str, Path], columns: Dict[str, list], date_cache: Dict[str, int]) -> int:
+    skipped = 0
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        index = _resolve_columns(next(reader))
+        for record in reader:
+            try:
+                if "series" in index and record[index["series"]].strip().upper() not in EQUITY_SERIES:
+                    continue
+                ticker = normalize_ticker(record[index["ticker"]])
+                if not ticker or len(ticker.encode("ascii")) > TICKER_WIDTH:
+                    raise ValueError(ticker)
+                raw_date = record[index["date"]]
+                day = date_cache.get(raw_date)
+                if day is None:
+                    day = date_cache[raw_date] = _day_number(raw_date)
+                close = float(record[index["close"]])
+                prices = [float(record[index[name]]) if name in index else close for name in PRICE_COLUMNS[:3]]
+                volume = int(float(record[index["volume"]])) if "volume" in index else 0
+                lot = int(float(record[index["lot_size"]] or 1)) if "lot_size" in index else 1
+            except (ValueError, IndexError, UnicodeEncodeError):
+                skipped += 1
+                continue
+            columns["ticker"].append(ticker)
+            columns["date"].append(day)
+            for name, value in zip(PRICE_COLUMNS, (*prices, close)):
+                columns[name].append(value)
+            columns["volume"].append(volume)
+            columns["lot_size"].append(max(1, lot))
+    return skipped
+
+
+def build_store(csv_paths: Iterable[Union[str, Path]], out_dir: Union[str, Path] = MARKET_DATA_DIR) -> MarketDataStore:
+    """Load CSV dumps into a new store at `out_dir` (replacing it); later files win on duplicate days."""
+    start = time.perf_counter()
+    columns = {name: [] for name in ("ticker", "date", *PRICE_COLUMNS, "volume", "lot_size")}
+    date_cache: Dict[str, int] = {}
+    skipped = 0
+    files = [Path(p) for p in csv_paths]
+    for path in files:
+        skipped += _read_csv(path, columns, date_cache)
+    if not columns["ticker"]:
+        raise ValueError("No usable rows in the given CSV files")
+
+    tickers = np.array(columns["ticker"], dtype=f"S{TICKER_WIDTH}")
+    dates = np.array(columns["date"], dtype=np.int32)
+    # lexsort is stable, so for a repeated (ticker, date) the row read last ends up last
+    order = np.lexsort((dates, tickers))
+    tickers, dates = tickers[order], dates[order]
+    keep = np.ones(len(order), dtype=bool)
+    keep[:-1] = (tickers[1:] != tickers[:-1]) | (dates[1:] != dates[:-1])
+    order, tickers, dates = order[keep], tickers[keep], dates[keep]
+
+    unique, first_rows = np.unique(tickers, return_index=True)
+    offsets = np.append(first_rows, len(tickers)).astype(np.int64)
+    lot_sizes = np.asarray(columns["lot_size"], dtype=np.int32)[order][offsets[1:] - 1]
+
+    out = Path(out_dir)
+    tmp = _build_dir(out)
+    tmp.mkdir(parents=True)
+    try:
+        _write_columns(tmp, unique, offsets, lot_sizes, dates, columns, order)
+        meta = {
+            "version": STORE_VERSION,
+            "tickers": int(len(unique)),
+            "rows": int(len(dates)),
+            "first_date": _from_day_number(dates.min()).isoformat(),
+            "last_date": _from_day_number(dates.max()).isoformat(),
+            "sources": [p.name for p in files],
+            "built_at": datetime.now().isoformat(timespec="seconds")
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    _swap_store(out, tmp)
+    log.info("Market data store built", {
+        **meta, "skipped_rows": skipped, "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+    })
+    return MarketDataStore(out)
+
+
+def _write_columns(tmp: Path, unique, offsets, lot_sizes, dates, columns: Dict[str, list], order):
+    np.save(tmp / "tickers.npy", unique)
+    np.save(tmp / "offsets.npy", offsets)
+    np.save(tmp / "lot_sizes.npy", lot_sizes)
+    np.save(tmp / "dates.npy", dates)
+    for name in PRICE_COLUMNS:
+        np.save(tmp / f"{name}.npy", np.asarray(columns[name], dtype=np.float64)[order])
+    np.save(tmp / "volume.npy", np.asarray(columns["volume"], dtype=np.int64)[order])
+
+
+def _build_dir(out: Path) -> Path:
+    return out.with_name(f"{out.name}.{uuid.uuid4().hex[:BUILD_ID_CHARS]}")
+
+
+def _swap_store(out: Path, build: Path):
+    """Point the `out` link at `build` in one rename, then delete all builds but it and the one it replaced.
+
+    The replaced build is kept for a reader that resolved the link just before the swap;
+    readers that already mapped older files keep them until they reopen.
+    """
+    previous = out.resolve() if out.is_symlink() else None
+    if out.exists() and not out.is_symlink():
+        # A store from before versioned builds is a plain directory: move it aside once
+        previous = _build_dir(out)
+        os.replace(out, previous)
+    link = out.with_name(f"{build.name}.link")
+    os.symlink(build.name, link, target_is_directory=True)
+    os.replace(link, out)
+
+    pattern = re.compile(rf"{re.escape(out.name)}\.[0-9a-f]{{{BUILD_ID_CHARS}}}")
+    for old in out.parent.iterdir():
+        if pattern.fullmatch(old.name) and old.name not in (build.name, getattr(previous, "name", None)):
+            shutil.rmtree(old, ignore_errors=True)
+
+
+# -------------------------------
+# SHARED INSTANCE
+# -------------------------------
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_market_store() -> Optional[MarketDataStore]:
+    """Store at MARKET_DATA_DIR, opened once per process; None while it has not been built.
+
+    A missing or unreadable store is not remembered, so one built later is picked up on the next call.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None and (Path(MARKET_DATA_DIR) / "meta.json").exists():
+                try:
+                    _store = MarketDataStore(MARKET_DATA_DIR)
+                except (OSError, ValueError) as e:
+                    log.error("Market data store unreadable", {"path": MARKET_DATA_DIR, "error": str(e)})
+    return _store
+
+
+def set_market_store(store: Optional[MarketDataStore]):
+    """Install a store (e.g. a freshly built one); None re-reads MARKET_DATA_DIR on next use."""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the local market data store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Load OHLCV CSV dumps into a memory-mapped store")
+    build.add_argument("csv", nargs="+", help="CSV files (ticker/symbol, date, open, high, low, close, volume)")
+    build.add_argument("--out", default=MARKET_DATA_DIR)
+    show = commands.add_parser("show", help="Print the latest bar of a ticker")
+    show.add_argument("ticker")
+    show.add_argument("--on", help="Latest bar on or before this date (YYYY-MM-DD)")
+    show.add_argument("--store", default=MARKET_DATA_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        store = build_store(args.csv, args.out)
+        print(f"{len(store)} tickers, {store.rows} rows -> {store.path}")
+    else:
+        bar = MarketDataStore(args.store).bar(args.ticker, args.on)
+        print(bar if bar else f"{args.ticker} not found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# -------------------------------
+# SCREENER
+# -------------------------------
+# Ranks the whole local universe in a few NumPy passes so the picker prompt gets a
+# short candidate table instead of pages of search snippets.
+#
+# Features (computed once per store, only the last WINDOW rows of each ticker are read):
+#   momentum    close / close MOMENTUM_DAYS sessions ago - 1
+#   volatility  annualised std of daily log returns over VOLATILITY_DAYS sessions
+#   value       earnings yield (1 / P/E) from the optional fundamentals CSV
+# Per budget: affordability (one lot <= equity budget) and a z-score composite rank.
+import csv
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.config import FUNDAMENTALS_PATH, SCREENER_TOP_N
+from src.logger import log
+from src.market.market_data_store import MarketDataStore, get_market_store, normalize_ticker
+from src.market.share_allocator import to_paise
+
+MOMENTUM_DAYS = 126          # ~6 months of sessions
+VOLATILITY_DAYS = 63         # ~3 months of sessions
+MIN_RETURNS = 20             # fewer daily returns than this -> no volatility estimate
+STALE_DAYS = 10              # tickers without a bar this close to the store's last date are skipped
+TRADING_DAYS = 252
+WEIGHTS = {"momentum": 0.5, "volatility": -0.3, "value": 0.2}
+
+FUNDAMENTAL_ALIASES = {
+    "ticker": ("ticker", "symbol"),
+    "pe": ("pe", "pe_ratio", "p/e", "price_to_earnings"),
+}
+
+
+@dataclass(slots=True)
+class Candidate:
+    ticker: str
+    price: float
+    lot_size: int
+    max_shares: int
+    cost: float
+    momentum: float
+    volatility: float
+    pe: Optional[float]
+    score: float
+
+
+def load_fundamentals(path: str, tickers: np.ndarray) -> np.ndarray:
+    """P/E per store ticker (NaN where unknown) from a `ticker, pe` CSV; all NaN when the file is absent."""
+    pe = np.full(len(tickers), np.nan)
+    if not Path(path).exists():
+        return pe
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader)]
+        index = {}
+        for column, aliases in FUNDAMENTAL_ALIASES.items():
+            index[column] = next((header.index(a) for a in aliases if a in header), None)
+        if index["ticker"] is None or index["pe"] is None:
+            log.warning("Fundamentals file lacks ticker/pe columns", {"path": path})
+            return pe
+        keys, values = [], []
+        for record in reader:
+            try:
+                keys.append(normalize_ticker(record[index["ticker"]]).encode("ascii"))
+                values.append(float(record[index["pe"]]))
+            except (ValueError, IndexError, UnicodeEncodeError):
+                continue
+    if keys:
+        keys = np.array(keys, dtype=tickers.dtype)
+        pos = np.clip(np.searchsorted(tickers, keys), 0, len(tickers) - 1)
+        found = tickers[pos] == keys
+        pe[pos[found]] = np.asarray(values)[found]
+    return pe
+
+
+def compute_features(store: MarketDataStore, fundamentals_path: str = FUNDAMENTALS_PATH) -> Dict[str, np.ndarray]:
+    """Budget-independent per-ticker features, aligned with store.column("tickers")."""
+    offsets = store.column("offsets")
+    starts, ends = offsets[:-1].astype(np.int64), offsets[1:].astype(np.int64)
+    window = max(MOMENTUM_DAYS, VOLATILITY_DAYS) + 1
+
+    # (n_tickers, window) gather of each ticker's last rows; short histories are left-padded
+    idx = ends[:, None] - window + np.arange(window)[None, :]
+    valid = idx >= starts[:, None]
+    closes = store.column("close")[np.where(valid, idx, starts[:, None])]
+    last = closes[:, -1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        momentum = np.where(valid[:, -1 - MOMENTUM_DAYS], last / closes[:, -1 - MOMENTUM_DAYS] - 1, np.nan)
+
+        tail = np.log(np.maximum(closes[:, -VOLATILITY_DAYS - 1:], 1e-9))
+        returns = np.diff(tail, axis=1)
+        ok = valid[:, -VOLATILITY_DAYS - 1:-1]
+        n = ok.sum(axis=1)
+        mean = np.where(ok, returns, 0.0).sum(axis=1) / np.maximum(n, 1)
+        var = np.where(ok, (returns - mean[:, None]) ** 2, 0.0).sum(axis=1) / np.maximum(n - 1, 1)
+        volatility = np.where(n >= MIN_RETURNS, np.sqrt(var * TRADING_DAYS), np.nan)
+
+        pe = load_fundamentals(fundamentals_path, store.column("tickers"))
+        earnings_yield = np.where(pe > 0, 1.0 / pe, np.nan)
+
+    last_day = store.column("dates")[ends - 1]
+    return {
+        "price": last,
+        "lot_size": np.asarray(store.column("lot_sizes"), dtype=np.int64),
+        "momentum": momentum,
+        "volatility": volatility,
+        "pe": pe,
+        "earnings_yield": earnings_yield,
+        "fresh": last_day >= last_day.max() - STALE_DAYS,
+    }
+
+
+def _zscore(values: np.ndarray) -> np.ndarray:
+    """Standardise ignoring NaNs; missing values score 0 (neutral)."""
+    finite = np.isfinite(values)
+    if finite.sum() < 2:
+        return np.zeros_like(values)
+    mu, sigma = values[finite].mean(), values[finite].std()
+    return np.where(finite, (values - mu) / sigma, 0.0) if sigma > 0 else np.zeros_like(values)
+
+
+def rank_candidates(features: Dict[str, np.ndarray], tickers: np.ndarray, equity_amount: float,
+                    top_n: int = SCREENER_TOP_N) -> List[Candidate]:
+    """Affordable, fresh tickers with a momentum and volatility estimate, best composite score first."""
+    lot_cost = features["price"] * features["lot_size"]
+    eligible = (
+        features["fresh"]
+        & (features["price"] > 0)
+        & (lot_cost <= equity_amount)
+        & np.isfinite(features["momentum"])
+        & np.isfinite(features["volatility"])
+    )
+    rows = np.flatnonzero(eligible)
+    if rows.size == 0:
+        return []
+
+    score = (
+        WEIGHTS["momentum"] * _zscore(features["momentum"][rows])
+        + WEIGHTS["volatility"] * _zscore(features["volatility"][rows])
+        + WEIGHTS["value"] * _zscore(features["earnings_yield"][rows])
+    )
+    # Whole lots the full budget buys, in exact paise (as the share allocator computes them)
+    lot_paise = np.maximum(to_paise(features["price"][rows]) * features["lot_size"][rows], 1)
+    lots = int(to_paise(equity_amount)) // lot_paise
+    k = min(top_n, rows.size)
+    best = np.argpartition(-score, k - 1)[:k]
+    best = best[np.argsort(-score[best], kind="stable")]
+
+    candidates = []
+    for j in best:
+        i = rows[j]
+        lot = int(features["lot_size"][i])
+        pe = float(features["pe"][i])
+        candidates.append(Candidate(
+            ticker=tickers[i].decode("ascii"),
+            price=float(features["price"][i]),
+            lot_size=lot,
+            max_shares=int(lots[j]) * lot,
+            cost=int(lots[j] * lot_paise[j]) / 100,
+            momentum=float(features["momentum"][i]),
+            volatility=float(features["volatility"][i]),
+            pe=pe if np.isfinite(pe) else None,
+            score=float(score[j])
+        ))
+    return candidates
+
+
+def candidate_table(candidates: List[Candidate]) -> str:
+    """Compact pipe table for the picker prompt."""
+    lines = ["Rank | Ticker | Price (₹) | Lot | Shares | Cost (₹) | 6m momentum | Volatility | P/E"]
+    for rank, c in enumerate(candidates, 1):
+        pe = f"{c.pe:.1f}" if c.pe is not None else "n/a"
+        lines.append(f"{rank} | {c.ticker} | {c.price:,.2f} | {c.lot_size} | {c.max_shares} | {c.cost:,.2f} | "
+                     f"{c.momentum:+.1%} | {c.volatility:.1%} | {pe}")
+    return "\n".join(lines)
+
+
+# -------------------------------
+# SHARED INSTANCE
+# -------------------------------
+_features = None
+_features_store = None
+_features_lock = threading.Lock()
+
+
+def screen_candidates(equity_amount: float, top_n: int = SCREENER_TOP_N) -> List[Candidate]:
+    """Rank the shared market data store for one budget; [] when no store is available."""
+    global _features, _features_store
+    store = get_market_store()
+    if store is None or len(store) == 0:
+        return []
+    start = time.perf_counter()
+    with _features_lock:
+        if _features_store is not store:
+            _features = compute_features(store)
+            _features_store = store
+        features = _features
+    candidates = rank_candidates(features, store.column("tickers"), equity_amount, top_n)
+    log.info("Stock screen completed", {
+        "universe": len(store),
+        "candidates": len(candidates),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+    })
+    return candidates
@@ -0,0 +1,148 @@
+# -------------------------------
+# SHARE ALLOCATOR
+# -------------------------------
+# Whole-share quantities across N stocks for an equity budget, computed in integer
+# paise so totals are exact. Both entry points start from the target weights
+# (floor of each stock's share of the budget, in whole lots), then spend the leftover:
+#   allocate_batch   any number of users at once; largest-lot-first greedy, one NumPy
+#                    pass per stock
+#   allocate_shares  one user; exact bounded knapsack over the leftover, so uninvested
+#                    cash is the smallest possible given the weight floor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+# Largest leftover (in units of the lot costs' GCD) the exact solver will take on;
+# above it allocate_shares falls back to the greedy fill
+DP_MAX_UNITS = 2_000_000
+
+
+@dataclass(slots=True)
+class ShareAllocation:
+    shares: List[int]
+    cost: float
+    cash_left: float
+    exact: bool
+
+
+def to_paise(amounts: ArrayLike) -> np.ndarray:
+    return np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64)
+
+
+def _target_lots(lot_cost: np.ndarray, budget: np.ndarray, weights: Optional[ArrayLike]) -> np.ndarray:
+    """Whole lots per stock that fit inside each stock's weighted slice of the budget."""
+    n_stocks = lot_cost.shape[-1]
+    w = np.ones(n_stocks) if weights is None else np.asarray(weights, dtype=np.float64)
+    w = np.broadcast_to(np.maximum(np.nan_to_num(w), 0.0), lot_cost.shape)
+    total = w.sum(axis=-1, keepdims=True)
+    w = np.divide(w, total, out=np.full(lot_cost.shape, 1.0 / n_stocks), where=total > 0)
+    slice_paise = np.floor(w * budget[..., None]).astype(np.int64)
+    return np.where(lot_cost > 0, slice_paise // np.maximum(lot_cost, 1), 0)
+
+
+def _greedy_fill(lot_cost: np.ndarray, left: np.ndarray) -> np.ndarray:
+    """Extra lots per row: repeatedly buy as many of the dearest lot that still fits."""
+    extra = np.zeros_like(lot_cost)
+    rows = np.arange(lot_cost.shape[0])
+    for _ in range(lot_cost.shape[1]):
+        fits = (lot_cost > 0) & (lot_cost <= left[:, None])
+        if not fits.any():
+            break
+        j = np.argmax(np.where(fits, lot_cost, 0), axis=1)
+        c = lot_cost[rows, j]
+        add = np.where(fits.any(axis=1), left // np.maximum(c, 1), 0)
+        extra[rows, j] += add
+        left = left - add * c
+    return extra
+
+
+def _exact_fill(lot_cost: np.ndarray, left: int, max_units: int) -> Optional[np.ndarray]:
+    """Extra lots that spend as much of `left` as possible (bounded knapsack), or None if too large."""
+    extra = np.zeros_like(lot_cost)
+    usable = np.flatnonzero((lot_cost > 0) & (lot_cost <= left))
+    if usable.size == 0:
+        return extra
+    g = int(np.gcd.reduce(lot_cost[usable]))
+    units = left // g
+    if units > max_units:
+        return None
+
+    # Binary splitting turns "up to k lots of stock i" into 0/1 pieces of 1, 2, 4, ... lots
+    pieces = []
+    for i in usable:
+        c = int(lot_cost[i]) // g
+        k, m = units // c, 1
+        while k > 0:
+            take = min(m, k)
+            pieces.append((int(i), take, take * c))
+            k -= take
+            m *= 2
+
+    reach = np.zeros(units + 1, dtype=bool)
+    reach[0] = True
+    # first piece that made each amount reachable; walking it back uses every piece at most once
+    parent = np.full(units + 1, -1, dtype=np.int32)
+    for p, (_, _, w) in enumerate(pieces):
+        new = np.zeros_like(reach)
+        new[w:] = reach[:-w]
+        new &= ~reach
+        parent[new] = p
+        reach |= new
+        if reach[units]:
+            break
+
+    amount = int(np.flatnonzero(reach)[-1])
+    while amount > 0:
+        i, lots, w = pieces[parent[amount]]
+        extra[i] += lots
+        amount -= w
+    return extra
+
+
+def allocate_batch(prices: ArrayLike, budgets: ArrayLike, weights: Optional[ArrayLike] = None,
+                   lot_sizes: Optional[ArrayLike] = None) -> np.ndarray:
+    """Whole shares for many users at once.
+
+    prices / weights / lot_sizes are (n_stocks,) or (n_users, n_stocks); budgets is (n_users,).
+    Returns an (n_users, n_stocks) int64 table of shares. Non-positive or NaN prices get 0.
+    """
+    budget = np.atleast_1d(to_paise(budgets))
+    price = np.nan_to_num(np.asarray(prices, dtype=np.float64), nan=0.0)
+    lots = np.ones_like(price, dtype=np.int64) if lot_sizes is None else np.asarray(lot_sizes, dtype=np.int64)
+    price, lots = np.broadcast_arrays(np.atleast_2d(price), np.atleast_2d(lots))
+    lot_cost = np.where(price > 0, to_paise(price) * np.maximum(lots, 1), 0)
+    lot_cost = np.broadcast_to(lot_cost, (budget.shape[0], lot_cost.shape[1]))
+    lots = np.broadcast_to(lots, lot_cost.shape)
+
+    n_lots = _target_lots(lot_cost, budget, weights)
+    left = budget - (n_lots * lot_cost).sum(axis=1)
+    n_lots += _greedy_fill(lot_cost, left)
+    return n_lots * np.maximum(lots, 1)
+
+
+def allocate_shares(prices: Sequence[float], budget: float, weights: Optional[Sequence[float]] = None,
+                    lot_sizes: Optional[Sequence[int]] = None, max_units: int = DP_MAX_UNITS) -> ShareAllocation:
+    """Whole shares for one user, leaving the least cash the weight floor allows."""
+    price = np.nan_to_num(np.asarray(prices, dtype=np.float64), nan=0.0)
+    lots = np.ones(price.shape, dtype=np.int64) if lot_sizes is None else np.maximum(np.asarray(lot_sizes), 1)
+    lot_cost = np.where(price > 0, to_paise(price) * lots, 0)
+    budget_paise = int(to_paise(budget))
+
+    n_lots = _target_lots(lot_cost[None, :], np.array([budget_paise]), weights)[0]
+    left = budget_paise - int((n_lots * lot_cost).sum())
+    extra = _exact_fill(lot_cost, left, max_units)
+    exact = extra is not None
+    if not exact:
+        extra = _greedy_fill(lot_cost[None, :], np.array([left]))[0]
+    n_lots += extra
+
+    spent = int((n_lots * lot_cost).sum())
+    return ShareAllocation(
+        shares=[int(s) for s in n_lots * lots],
+        cost=spent / 100,
+        cash_left=(budget_paise - spent) / 100,
+        exact=exact
+    )
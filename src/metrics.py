@@ -0,0 +1,211 @@
+# -------------------------------
+# METRICS
+# -------------------------------
+# In-process metrics registry: counters, latency summaries with p50/p95/p99, and
+# gauges collected on demand (cache hit ratios). Exported in Prometheus text
+# format from the service (GET /metrics) or to METRICS_PATH at the end of a run.
+#
+# Labels are low-cardinality (node, tool, model, ...); run ids stay in the logs.
+import threading
+import time
+from collections import deque
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+QUANTILES = (0.5, 0.95, 0.99)
+# Percentiles are computed over the most recent observations of each series
+SAMPLE_WINDOW = 4096
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[dict]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an unsorted list (q in 0..1)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))]
+
+
+class _Summary:
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, str] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._summaries: Dict[str, Dict[LabelKey, _Summary]] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, dict, float]]]] = []
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, labels: Optional[dict] = None):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[dict] = None):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._summaries.setdefault(name, {})
+            summary = series.get(key)
+            if summary is None:
+                summary = series[key] = _Summary()
+            summary.observe(value)
+
+    def timed(self, name: str, **labels):
+        """Decorator: observe the wall time of every call (seconds) under `name`."""
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start, labels)
+
+            return wrapper
+
+        return decorator
+
+    def samples(self, name: str) -> Dict[LabelKey, List[float]]:
+        """Recent observations of summary `name` per label set, e.g. {(("node", "x"),): [0.12, ...]}."""
+        with self._lock:
+            return {k: list(s.samples) for k, s in self._summaries.get(name, {}).items()}
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, dict, float]]]):
+        """`collector()` yields (gauge_name, labels, value) at export time."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _collect_gauges(self) -> Dict[str, Dict[LabelKey, float]]:
+        gauges: Dict[str, Dict[LabelKey, float]] = {}
+        for collector in list(self._collectors):
+            try:
+                for name, labels, value in collector():
+                    gauges.setdefault(name, {})[_label_key(labels)] = float(value)
+            except Exception:
+                # A broken collector must not take the export down with it
+                continue
+        return gauges
+
+    def snapshot(self) -> dict:
+        """Plain-dict view: counters, summaries with p50/p95/p99, gauges."""
+        with self._lock:
+            counters = {name: {_format_labels(k) or "": v for k, v in series.items()}
+                        for name, series in self._counters.items()}
+            summaries = {
+                name: {
+                    _format_labels(k) or "": {
+                        "count": s.count,
+                        "sum": round(s.total, 6),
+                        **{f"p{int(q * 100)}": round(percentile(list(s.samples), q), 6) for q in QUANTILES}
+                    }
+                    for k, s in series.items()
+                }
+                for name, series in self._summaries.items()
+            }
+        gauges = {name: {_format_labels(k) or "": v for k, v in series.items()}
+                  for name, series in self._collect_gauges().items()}
+        return {"counters": counters, "summaries": summaries, "gauges": gauges}
+
+    def render_prometheus(self) -> str:
+        lines = []
+
+        def header(name: str, kind: str):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            summaries = {n: {k: (s.count, s.total, list(s.samples)) for k, s in series.items()}
+                         for n, series in self._summaries.items()}
+
+        for name, series in sorted(counters.items()):
+            header(name, "counter")
+            for key, value in series.items():
+                lines.append(f"{name}{_format_labels(key)} {value:.15g}")
+
+        for name, series in sorted(summaries.items()):
+            header(name, "summary")
+            for key, (count, total, samples) in series.items():
+                for q in QUANTILES:
+                    lines.append(f"{name}{_format_labels(key, ('quantile', str(q)))} {percentile(samples, q):.6g}")
+                lines.append(f"{name}_sum{_format_labels(key)} {total:.6g}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+
+        for name, series in sorted(self._collect_gauges().items()):
+            header(name, "gauge")
+            for key, value in series.items():
+                lines.append(f"{name}{_format_labels(key)} {value:.15g}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Atomically write the text exposition (for node_exporter's textfile collector or scraping by hand)."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(self.render_prometheus(), encoding="utf-8")
+        tmp.replace(target)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+metrics = MetricsRegistry()
+
+metrics.describe("node_duration_seconds", "Wall time of one graph node call")
+metrics.describe("node_calls_total", "Graph node calls by outcome")
+metrics.describe("llm_calls_total", "Chat model requests (source=api or cache)")
+metrics.describe("llm_call_duration_seconds", "Latency of chat model requests that reached the API")
+metrics.describe("llm_tokens_total", "Tokens reported by the provider (kind=input or output)")
+metrics.describe("tool_duration_seconds", "Wall time of one tool call")
+metrics.describe("retries_total", "Retries performed by utils.retry")
+metrics.describe("retry_failures_total", "Calls that still failed after the last retry")
+metrics.describe("cache_hits", "Cache hits since process start")
+metrics.describe("cache_misses", "Cache misses since process start")
+metrics.describe("cache_hit_ratio", "hits / (hits + misses) since process start")
+
+
+def cache_gauges(cache_name: str, stats: Optional[dict]) -> List[Tuple[str, dict, float]]:
+    """Turn a {hits, misses, hit_ratio} stats dict into gauge samples."""
+    if not stats:
+        return []
+    labels = {"cache": cache_name}
+    return [
+        ("cache_hits", labels, stats.get("hits", 0)),
+        ("cache_misses", labels, stats.get("misses", 0)),
+        ("cache_hit_ratio", labels, stats.get("hit_ratio", 0.0)),
+    ]
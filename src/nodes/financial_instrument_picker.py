@@ -1,82 +1,196 @@
 # src/nodes/financial_instrument_picker.py
 import json
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
+import time
+from datetime import date
+from typing import Optional
+from langchain_core.messages import SystemMessage, HumanMessage
+from langgraph.types import interrupt
 from src.helpers.load_prompt import load_prompt
-from src.config import llm_client
+from src.config import (get_llm_client, CONTEXT_TOKEN_BUDGETS, STREAM_RECOMMENDATION, SCREENER_RESEARCH_CHARS,
+                        MARKET_DATA_MAX_AGE_DAYS)
 from src.entity.finance_state import State
-from src.utils import safe_float, prune_messages
+from src.utils import build_context
 from src.logger import log
-from src.helpers.pretty_print import banner, stock_recommendation, success, warning, section
+from src.helpers.pretty_print import (banner, stock_recommendation, recommendation_header, recommendation_line,
+                                      success, warning, section, money, info)
+from src.helpers.recommendation_parser import (RecommendationParser, Recommendation, parse_recommendation,
+                                               format_recommendation)
+from src.helpers.confirmation import is_approval
+from src.market.market_data_store import get_market_store
+from src.market.screener import screen_candidates, candidate_table
+from src.market.share_allocator import allocate_shares
+from src.nodes.market_research import NO_RESEARCH
+
+
+def _check_field(field: str, value, equity_amount: float):
+    """Validation that can run as soon as a single line of the reply is complete."""
+    if field == "total_cost" and value > equity_amount:
+        log.warning("Recommendation exceeds equity budget", {"total_cost": value, "budget": equity_amount})
+        warning(f"Total cost {money(value)} exceeds the equity budget {money(equity_amount)}")
+    elif field == "shares" and value <= 0:
+        log.warning("Recommendation has no whole shares", {"shares": value})
+
+
+def _stream_recommendation(messages: list, equity_amount: float) -> str:
+    """Render the reply line by line as tokens arrive, parsing each field as its line completes."""
+    parser = RecommendationParser()
+    parts = []
+    start = time.perf_counter()
+    first_token_ms = None
+
+    recommendation_header()
+    for chunk in get_llm_client().stream(messages):
+        text = chunk.content if isinstance(chunk.content, str) else ""
+        if not text:
+            continue
+        if first_token_ms is None:
+            first_token_ms = round((time.perf_counter() - start) * 1000, 2)
+        parts.append(text)
+        for line, parsed in parser.feed(text):
+            recommendation_line(line)
+            if parsed:
+                _check_field(*parsed, equity_amount)
+    for line, parsed in parser.close():
+        recommendation_line(line)
+        if parsed:
+            _check_field(*parsed, equity_amount)
+    print()
+
+    log.info("Recommendation streamed", {
+        "first_token_ms": first_token_ms,
+        "total_ms": round((time.perf_counter() - start) * 1000, 2),
+        "complete": parser.result.complete
+    })
+    return "".join(parts)
+
+
+def _validate_with_market_data(suggestion: str, equity_amount: float) -> Optional[str]:
+    """
+    Recompute price, shares and total cost from the local market data store (exact, via allocate_shares).
+    Returns the (possibly corrected) recommendation, or None when not even one lot is affordable.
+    Without a store, for a ticker it does not know, or when its latest bar is stale or has no
+    usable close, the LLM's answer is kept as is.
+    """
+    store = get_market_store()
+    if store is None:
+        return suggestion
+    rec = parse_recommendation(suggestion)
+    bar = store.bar(rec.ticker) if rec.ticker else None
+    if bar is None:
+        log.warning("Recommended ticker not in market data", {"ticker": rec.ticker})
+        warning(f"Could not verify {rec.ticker or 'the recommendation'} against local market data")
+        return suggestion
+    age_days = (date.today() - bar.date).days
+    if age_days > MARKET_DATA_MAX_AGE_DAYS:
+        log.warning("Market data too old to verify recommendation", {
+            "ticker": bar.ticker, "as_of": bar.date.isoformat(), "age_days": age_days,
+            "max_age_days": MARKET_DATA_MAX_AGE_DAYS
+        })
+        warning(f"Market data for {bar.ticker} is {age_days} days old; price and quantity not verified")
+        return suggestion
+    if not bar.close > 0:
+        log.warning("Market data has no usable close", {"ticker": bar.ticker, "close": bar.close})
+        warning(f"Could not verify {bar.ticker}: no usable close in local market data")
+        return suggestion
+
+    lot = store.lot_size(bar.ticker)
+    price = round(bar.close, 2)
+    allocation = allocate_shares([price], equity_amount, lot_sizes=[lot])
+    shares = allocation.shares[0]
+    checked = Recommendation(
+        stock_name=rec.stock_name or bar.ticker,
+        ticker=bar.ticker,
+        price=price,
+        shares=shares,
+        total_cost=allocation.cost
+    )
+    changes = {
+        name: {"llm": getattr(rec, name), "market_data": getattr(checked, name)}
+        for name in ("price", "shares", "total_cost")
+        if getattr(rec, name) is None or abs(getattr(rec, name) - getattr(checked, name)) >= 0.01
+    }
+    if shares == 0:
+        log.warning("Recommended stock is above the equity budget", {
+            "ticker": bar.ticker, "price": checked.price, "lot_size": lot, "budget": equity_amount
+        })
+        warning(f"{bar.ticker} costs {money(checked.price * lot)} per lot, above the budget {money(equity_amount)}")
+        return None
+    if not changes:
+        return suggestion
+
+    log.warning("Recommendation corrected from market data", {
+        "ticker": bar.ticker, "as_of": bar.date.isoformat(), "changes": changes
+    })
+    corrected = format_recommendation(checked)
+    info(f"Price and quantity corrected from market data as of {bar.date.isoformat()}")
+    stock_recommendation(corrected)
+    return corrected
 
 
 @log.time_node("llm_investment_executor")
 def llm_investment_executor_node(state: State) -> dict:
     """
-    Final Agent: Picks ONE stock, shows price & quantity, asks for human confirmation.
+    Final Agent: Picks ONE stock and shows price & quantity; confirmation happens in investment_confirmation_node.
     Uses external prompt file: prompts/user_prompt_inst_picker_final.txt
     """
     log.info("Agent 3: Investment Instrument Picker Started")
     section("Agent 3 : Instrument Picker Agent Started")
     # === 1. Extract Equity Amount ===
-    portfolio = state.get("portfolio") or {}
-    equity_str = portfolio.get("Equity (Stocks)", "₹0")
-    equity_amount = safe_float(equity_str.replace("₹", "").replace(",", ""))
+    portfolio = state.get("portfolio")
+    equity_amount = portfolio.equity if portfolio else 0.0
 
     if equity_amount < 5000:
         log.warning("Equity allocation too low", {"amount": equity_amount})
         print("Equity allocation below ₹5,000. Skipping stock picking.")
-        warning(f"Equity too low: {equity_str} → Skipping stock picking")
+        warning(f"Equity too low: {money(equity_amount)} → Skipping stock picking")
         state["investment_instruments"] = ["Skipped: Low equity"]
         state["investment_instruments"] = ["Skipped: Low equity amount"]
         return state
 
     try:
-        # === 2. Find search results from previous tool call ===
-        search_content = "No recent search results available."
-        for msg in reversed(state["messages"]):
-            if isinstance(msg, ToolMessage) and len(str(msg.content)) > 100:
-                search_content = str(msg.content)
-                break
+        # === 2. Ranked candidates from local data; research from the parallel market_research branch ===
+        candidates = screen_candidates(equity_amount)
+        search_content = state.get("market_research") or NO_RESEARCH
+        if candidates:
+            # The table carries the ranking; snippets only add colour
+            search_content = search_content[:SCREENER_RESEARCH_CHARS]
 
         # === 3. Load external final prompt ===
         prompt_template = load_prompt("user_prompt_inst_picker.txt")
         final_prompt_text = prompt_template.format(
             equity_amount=equity_amount,
-            search_content=search_content[:12000]  # Limit context
+            candidate_table=candidate_table(candidates) if candidates else "No pre-screened candidates available.",
+            search_content=search_content
         )
 
         # === 4. Build message history ===
-        messages = prune_messages(state["messages"], max_messages=20) + [
+        messages = build_context(state["messages"] + [
             SystemMessage(content=load_prompt("system_prompt_inst_picker.txt")),
             HumanMessage(content=final_prompt_text)
-        ]
+        ], CONTEXT_TOKEN_BUDGETS["llm_investment_executor"], node="llm_investment_executor")
 
         # === 5. Show header ===
         #banner("BEST STOCK RECOMMENDATION FOR YOU", "✨", 70)
 
 
         # === 6. Get final suggestion from LLM (no tool calling) ===
-        response = llm_client.invoke(messages)
-        suggestion = response.content.strip()
-
-        stock_recommendation(suggestion)
-
-        # === 7. Human confirmation ===
-        confirm = input("\nDo you want to confirm this purchase? (yes/no): ").strip().lower()
-
-        if confirm in ["yes", "y"]:
-            success("Purchase confirmed! Proceeding to Zerodha API in next phase...")
-            state["investment_instruments"] = [suggestion]
-            state["investment_execution"] = "confirmed_by_user"
+        if STREAM_RECOMMENDATION:
+            suggestion = _stream_recommendation(messages, equity_amount).strip()
         else:
-            warning("Purchase cancelled by user.")
-            state["investment_instruments"] = ["Cancelled by user"]
-            state["investment_execution"] = "cancelled"
+            response = get_llm_client().invoke(messages)
+            suggestion = response.content.strip()
+            stock_recommendation(suggestion)
+
+        # === 7. Check the numbers against local market data ===
+        suggestion = _validate_with_market_data(suggestion, equity_amount)
+        if suggestion is None:
+            state["investment_instruments"] = ["Skipped: Recommended stock above budget"]
+            return state
 
-        print("Thank you")
-        log.info("Stock picking completed", {"confirmed": confirm in ["yes", "y"]})
-        print("\nThank you for using Monthly Stock Picker!")
-        print("Made with ❤️ for smart investors\n")
+        # === 8. Hand over to the confirmation interrupt ===
+        state["pending_recommendation"] = suggestion
+        state["investment_execution"] = "awaiting_confirmation"
+        log.info("Stock picked, awaiting confirmation")
 
     except Exception as e:
         error_msg = f"Stock picker failed: {str(e)}"
@@ -87,6 +201,35 @@ def llm_investment_executor_node(state: State) -> dict:
     return state
 
 
+@log.time_node("investment_confirmation")
+def investment_confirmation_node(state: State) -> dict:
+    """
+    Human-in-the-loop step modeled as a graph interrupt: the run is checkpointed and the
+    worker released until a decision arrives via Command(resume="approve" | "reject").
+    """
+    suggestion = state.get("pending_recommendation")
+    decision = interrupt({
+        "type": "purchase_confirmation",
+        "recommendation": suggestion,
+        "question": "Do you want to confirm this purchase? (yes/no)"
+    })
+    confirmed = is_approval(decision)
+
+    if confirmed:
+        success("Purchase confirmed! Proceeding to Zerodha API in next phase...")
+        state["investment_instruments"] = [suggestion]
+        state["investment_execution"] = "confirmed_by_user"
+    else:
+        warning("Purchase cancelled by user.")
+        state["investment_instruments"] = ["Cancelled by user"]
+        state["investment_execution"] = "cancelled"
+
+    log.info("Stock picking completed", {"confirmed": confirmed})
+    print("\nThank you for using Monthly Stock Picker!")
+    print("Made with ❤️ for smart investors\n")
+    return state
+
+
 # This node is kept only for compatibility — it will rarely run
 @log.time_node("investment_tools")
 def investment_tools_node(state: State) -> dict:
@@ -0,0 +1,37 @@
+# src/nodes/market_research.py
+from src.config import MARKET_RESEARCH_QUERY, MARKET_RESEARCH_MAX_CHARS
+from src.entity.finance_state import State
+from src.logger import log
+from src.tools.search_tool import cached_search
+
+NO_RESEARCH = "No recent search results available."
+
+
+def format_search_results(result) -> str:
+    """Compact text for the picker prompt: one line per result instead of the raw JSON."""
+    if not isinstance(result, dict):
+        return str(result or "")
+    lines = []
+    if result.get("answer"):
+        lines.append(str(result["answer"]))
+    for item in result.get("results") or []:
+        title = item.get("title", "").strip()
+        content = " ".join(str(item.get("content", "")).split())
+        lines.append(f"- {title} ({item.get('url', '')}): {content}")
+    return "\n".join(lines)
+
+
+@log.time_node("market_research")
+def market_research_node(state: State) -> dict:
+    """
+    Fetches stock research for the picker. It does not depend on the statement, so it
+    runs from START alongside the transaction analyzer and joins before the picker.
+    Returns only its own key: the analyzer branch owns the rest of the state.
+    """
+    try:
+        research = format_search_results(cached_search(MARKET_RESEARCH_QUERY))[:MARKET_RESEARCH_MAX_CHARS]
+        log.info("Market research fetched", {"chars": len(research)})
+    except Exception as e:
+        log.error("Market research failed", {"error": str(e)})
+        research = ""
+    return {"market_research": research or NO_RESEARCH}
@@ -1,21 +1,22 @@
 # nodes/portfolio_allocator.py
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, AIMessage
-from src.config import llm_client
+from src.config import (get_llm_client, CONTEXT_TOKEN_BUDGETS, PROJECTION_ENABLED, PROJECTION_YEARS,
+                        PROJECTION_PATHS, PROJECTION_SEED)
 from src.entity.finance_state import State
+from src.entity.portfolio_allocation import PortfolioAllocation
 from src.helpers.load_prompt import load_prompt
-from src.tools.portfolio_builder import portfolio_builder_tool
+from src.tools.portfolio_builder import portfolio_builder_tool, build_portfolios
+from src.tools.portfolio_projection import projection_summary
 from src.tools.tools_registry import create_tool_registry
-from src.utils import retry, prune_messages, safe_float
-from src.helpers.pretty_print import section, result_box, info, money
+from src.utils import retry, build_context
+from src.helpers.pretty_print import section, portfolio_box, projection_box, info, money
 from src.logger import log
 
 import json
 import re
 
 
-@log.time_node("portfolio_llm")
-def llm_portfolio_node(state: State) -> dict:
-    """LLM generates portfolio allocation plan with full resilience."""
+def _announce_portfolio_stage(state: State):
     log.info("Agent 2: Portfolio Generator Agent Started", {
         "total_savings": state.get("total_savings"),
         "user_age": state.get("user_age"),
@@ -23,11 +24,29 @@ def llm_portfolio_node(state: State) -> dict:
     })
     section("Agent 2 : Portfolio Generator Agent Started")
     info("Building an investment portfolio using the '100 - age' rule")
-    print(f"Total Savings : {money(state['total_savings'])}")
+    print(f"Total Savings : {money(state['total_savings'] or 0.0)}")
     print(f"Age           : {state['user_age']}")
     print(f"Insured       : {state['insured']}\n")
 
-    messages = prune_messages(state["messages"], max_messages=15)
+
+@log.time_node("portfolio_direct")
+def portfolio_direct_node(state: State) -> dict:
+    """Deterministic allocation from the typed state — no LLM round trip."""
+    _announce_portfolio_stage(state)
+    state["portfolio"] = _table_portfolio_allocation(
+        total_savings=state.get("total_savings", 0.0),
+        user_age=state.get("user_age", 35),
+        insured=state.get("insured", False)
+    )
+    portfolio_box("FINAL PORTFOLIO ALLOCATION", state["portfolio"])
+    log.info("Portfolio built directly", {"portfolio": state["portfolio"].as_dict()})
+    return state
+
+
+@log.time_node("portfolio_llm")
+def llm_portfolio_node(state: State) -> dict:
+    """LLM generates portfolio allocation plan with full resilience."""
+    _announce_portfolio_stage(state)
 
     try:
         system_prompt = load_prompt("system_prompt_portfolio_builder.txt")
@@ -45,15 +64,15 @@ def llm_portfolio_node(state: State) -> dict:
         )
 
         tools = [portfolio_builder_tool]
-        llm_with_tools = llm_client.bind_tools(
+        llm_with_tools = get_llm_client().bind_tools(
             tools,
             tool_choice={"type": "function", "function": {"name": "portfolio_builder_tool"}}
         )
 
-        full_messages = messages + [
+        full_messages = build_context(state["messages"] + [
             SystemMessage(content=system_prompt),
             HumanMessage(content=human_prompt)
-        ]
+        ], CONTEXT_TOKEN_BUDGETS["portfolio_llm"], node="portfolio_llm")
 
         log.debug("Invoking LLM for portfolio allocation")
         response = llm_with_tools.invoke(full_messages)
@@ -71,7 +90,7 @@ def llm_portfolio_node(state: State) -> dict:
             "fallback_used": True
         })
         # Fallback: use rule-based allocation
-        state["portfolio"] = _fallback_portfolio_allocation(
+        state["portfolio"] = _table_portfolio_allocation(
             total_savings=state.get("total_savings", 0.0),
             user_age=state.get("user_age", 35),
             insured=state.get("insured", False)
@@ -94,12 +113,12 @@ def portfolio_tools_node(state: State) -> dict:
     if not tool_calls:
         log.warning("No tool calls found in portfolio LLM response")
         # Use fallback if tool wasn't called
-        state["portfolio"] = _fallback_portfolio_allocation(
+        state["portfolio"] = _table_portfolio_allocation(
             total_savings=state.get("total_savings", 0.0),
             user_age=state.get("user_age", 35),
             insured=state.get("insured", False)
         )
-        log.info("Fallback portfolio applied (no tool call)", {"portfolio": state["portfolio"]})
+        log.info("Fallback portfolio applied (no tool call)", {"portfolio": state["portfolio"].as_dict()})
         return state
 
     for call in tool_calls:
@@ -107,7 +126,7 @@ def portfolio_tools_node(state: State) -> dict:
         args = call["args"]
 
         try:
-            log.debug("Executing portfolio tool", {"tool": tool_name, "args": args})
+            log.debug("Executing portfolio tool", lambda: {"tool": tool_name, "args": dict(args)})
 
             # Fix common LLM argument type issues
             args = {
@@ -122,10 +141,9 @@ def portfolio_tools_node(state: State) -> dict:
             if isinstance(result, dict) and "error" in result:
                 raise ValueError(result["error"])
 
-            state["portfolio"] = result
+            state["portfolio"] = PortfolioAllocation.from_dict(result)
             tool_messages.append(ToolMessage(content=json.dumps(result), tool_call_id=call["id"]))
-            if state.get("portfolio"):
-                result_box("FINAL PORTFOLIO ALLOCATION", state["portfolio"])
+            portfolio_box("FINAL PORTFOLIO ALLOCATION", state["portfolio"])
             log.info("Portfolio successfully built", {"portfolio": result})
 
         except Exception as e:
@@ -135,7 +153,7 @@ def portfolio_tools_node(state: State) -> dict:
                 "error": str(e),
                 "fallback_used": True
             })
-            fallback = _fallback_portfolio_allocation(
+            fallback = _table_portfolio_allocation(
                 total_savings=state.get("total_savings", 0.0),
                 user_age=state.get("user_age", 35),
                 insured=state.get("insured", False)
@@ -148,26 +166,41 @@ def portfolio_tools_node(state: State) -> dict:
     return state
 
 
-def _fallback_portfolio_allocation(total_savings: float, user_age: int, insured: bool) -> dict:
-    """Pure Python fallback using 100 - age rule."""
-    if total_savings <= 0:
-        return {"Emergency Fund": "₹0.00", "Note": "No savings to invest"}
+@log.time_node("portfolio_projection")
+def portfolio_projection_node(state: State) -> dict:
+    """
+    Monte Carlo outlook of contributing this allocation every month; an illustration, not advice.
+    Runs beside the picker (nothing downstream reads it), so it returns only its own key.
+    """
+    portfolio = state.get("portfolio")
+    if not PROJECTION_ENABLED or not portfolio or portfolio.total <= 0:
+        return {}
 
-    equity_pct = max(10, min(90, 100 - user_age))
-    bond_pct = 80 - equity_pct + 20
-    emergency_pct = 10
-    insurance_pct = 10 if not insured else 0
+    try:
+        projection = projection_summary(
+            [portfolio.equity, portfolio.bonds, portfolio.emergency_fund],
+            months=PROJECTION_YEARS * 12,
+            paths=PROJECTION_PATHS,
+            seed=PROJECTION_SEED
+        )
+    except Exception as e:
+        log.error("Portfolio projection failed", {"error": str(e)})
+        return {}
+
+    projection_box(projection)
+    log.info("Portfolio projected", {
+        "years": PROJECTION_YEARS,
+        "paths": PROJECTION_PATHS,
+        "final_total": projection["final"]["total"]
+    })
+    return {"projection": projection}
 
-    total_pct = equity_pct + bond_pct + emergency_pct + insurance_pct
-    equity_pct = equity_pct / total_pct * 90
-    bond_pct = bond_pct / total_pct * 90
-    emergency_pct = 10
 
-    amount = lambda pct: total_savings * pct / 100
+def _table_portfolio_allocation(total_savings: float, user_age: int, insured: bool) -> PortfolioAllocation:
+    """The '100 - age' table row portfolio_builder_tool would return, without the LLM.
+    Used by portfolio_direct_node, and as the fallback when the tool path fails."""
+    if not total_savings or total_savings <= 0:
+        log.info("No savings to invest")
+        return PortfolioAllocation()
 
-    return {
-        "Equity (Stocks)": f"₹{amount(equity_pct):,.2f}",
-        "Bond Securities": f"₹{amount(bond_pct):,.2f}",
-        "Emergency Fund": f"₹{amount(emergency_pct):,.2f}",
-        "Insurance (Recommended)": f"₹{amount(insurance_pct):,.2f}" if not insured else None
-    }
\ No newline at end of file
+    return PortfolioAllocation.from_row(build_portfolios(total_savings, user_age or 35, bool(insured))[0])
\ No newline at end of file
@@ -1,11 +1,17 @@
 # src/nodes/transaction_analyzer.py
-from langchain_core.messages import ToolMessage, AIMessage
-from src.config import llm_client
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from langchain_core.messages import ToolMessage, AIMessage, SystemMessage, HumanMessage
+from src.config import (
+    get_llm_client, PARSER_MIN_CONFIDENCE, CONTEXT_TOKEN_BUDGETS,
+    ANALYSIS_MODE, ANALYZER_CHUNK_CHARS, ANALYZER_CHUNK_WORKERS
+)
 from src.entity.finance_state import State
-from src.helpers.currency_formatter import format_currency_inr
-from src.tools.pdf_reader import pdf_reader_tool
+from src.helpers.load_prompt import load_prompt
+from src.helpers.statement_parser import parse_statement, split_statement, ParsedStatement, StatementParser
+from src.tools.pdf_reader import pdf_reader_tool, iter_statement_text
 from src.tools.tools_registry import create_tool_registry
-from src.utils import retry, safe_float, prune_messages
+from src.utils import retry, safe_float, build_context
 from src.logger import log
 from src.helpers.pretty_print import section, success, money, result_box, info
 import re
@@ -16,11 +22,35 @@ def llm_transaction_analyzer_node(state: State) -> dict:
     log.info("Agent 1: Transaction Analyzer Started")
     section("Agent 1 : Transaction Analyzer Agent Started")
     info("Start Analyzing Transactions")
-    messages = prune_messages(state["messages"])
+    messages = build_context(state["messages"], CONTEXT_TOKEN_BUDGETS["transaction_analyzer"],
+                             node="transaction_analyzer")
 
     try:
+        # Fast path: parse the statement directly and skip both LLM calls
+        statement_path = state.get("statement_path")
+        if statement_path:
+            statement_text, parsed = _read_and_parse(statement_path)
+            if parsed:
+                total_savings = parsed.savings
+                log.info("Savings extracted by statement parser", {
+                    "total_savings": parsed.savings,
+                    "transactions": len(parsed.transactions),
+                    "confidence": round(parsed.confidence, 3)
+                })
+            elif _use_map_reduce(statement_text):
+                total_savings = _map_reduce_savings(statement_text)
+            else:
+                total_savings = None
+
+            if total_savings is not None:
+                state["total_savings"] = total_savings
+                state["messages"].append(AIMessage(content=f"Total savings: {total_savings}"))
+                print(f"-------Final Result of Agent 1--------")
+                print(f"Total savings in Current Month: {money(total_savings)}")
+                return state
+
         tools = [pdf_reader_tool]
-        llm_with_tools = llm_client.bind_tools(tools, tool_choice="auto")
+        llm_with_tools = get_llm_client().bind_tools(tools, tool_choice="auto")
 
         response = llm_with_tools.invoke(messages)
         state["messages"].append(response)
@@ -32,7 +62,6 @@ def llm_transaction_analyzer_node(state: State) -> dict:
         # Parse savings from final response
         total_savings = _extract_savings_from_response(response.content)
         state["total_savings"] = total_savings
-        state["formatted_savings"] = format_currency_inr(total_savings)
         if state.get("total_savings", 0) > 0:
             print(f"-------Final Result of Agent 1--------")
             print(f"Total savings in Current Month: {money(state['total_savings'])}")
@@ -41,14 +70,112 @@ def llm_transaction_analyzer_node(state: State) -> dict:
     except Exception as e:
         log.error("Transaction analyzer failed", {"error": str(e)})
         state["total_savings"] = 0.0
-        state["formatted_savings"] = format_currency_inr(0.0)
 
     return state
 
 
+def _read_and_parse(statement_path: str) -> Tuple[Optional[str], Optional[ParsedStatement]]:
+    """Extract the statement and parse it page by page as pages arrive, holding only the pages
+    in flight. Returns (None, parse) when the parse is confident; otherwise (text, None) with the
+    text re-read from the PDF cache for the map-reduce / LLM fallbacks (text is None on read errors)."""
+    print(f"Reading {statement_path}")
+    parser = StatementParser()
+    has_text = False
+    try:
+        for page in iter_statement_text(statement_path):
+            has_text = has_text or bool(page.strip())
+            parser.feed(page)
+    except Exception as e:
+        log.error("Statement read failed", {"path": statement_path, "error": str(e)})
+        return None, None
+    parsed = _confident_parse(parser.close()) if has_text else None
+    if parsed or not has_text:
+        return None, parsed
+    # Only the fallbacks need the whole text; the pass above just cached it
+    return "".join(iter_statement_text(statement_path)), None
+
+
+def _parse_savings_fast_path(text) -> Optional[ParsedStatement]:
+    """Rule-based savings extraction; None when the parse is not confident enough to skip the LLM."""
+    if not isinstance(text, str) or not text.strip():
+        return None
+    return _confident_parse(parse_statement(text))
+
+
+def _confident_parse(parsed: ParsedStatement) -> Optional[ParsedStatement]:
+    log.debug("Statement parsed", {
+        "transactions": len(parsed.transactions),
+        "unparsed_lines": parsed.unparsed_lines,
+        "confidence": round(parsed.confidence, 3)
+    })
+    if parsed.transactions and parsed.confidence >= PARSER_MIN_CONFIDENCE:
+        return parsed
+    return None
+
+
+def _use_map_reduce(text) -> bool:
+    if not isinstance(text, str) or not text.strip():
+        return False
+    if ANALYSIS_MODE == "map_reduce":
+        return True
+    return ANALYSIS_MODE == "auto" and len(text) > ANALYZER_CHUNK_CHARS
+
+
+# Only parse failures are retried here: provider errors are already retried by the guard
+@retry(max_attempts=3, retry_on=(ValueError,))
+def _analyze_chunk(chunk: str, chunk_number: int, chunk_count: int) -> Tuple[float, float]:
+    """Map step: (income, expenses) of one chunk — parsed locally when possible, else by the LLM."""
+    parsed = _parse_savings_fast_path(chunk)
+    if parsed:
+        return parsed.income, parsed.expenses
+
+    messages = build_context([
+        SystemMessage(content=load_prompt("system_prompt_chunk_analyzer.txt")),
+        HumanMessage(content=load_prompt("user_prompt_chunk_analyzer.txt").format(
+            chunk_number=chunk_number, chunk_count=chunk_count, chunk=chunk
+        ))
+    ], CONTEXT_TOKEN_BUDGETS["transaction_analyzer_chunk"], node="transaction_analyzer_chunk")
+    # Keep malformed replies out of the LLM cache, otherwise every retry replays the same one
+    response = get_llm_client().invoke(messages, validate=lambda m: _chunk_totals(m.content) is not None)
+
+    totals = _chunk_totals(response.content)
+    if totals is None:
+        raise ValueError(f"Chunk {chunk_number}/{chunk_count}: no income/expenses in LLM response")
+    return totals
+
+
+def _chunk_totals(content) -> Optional[Tuple[float, float]]:
+    """(income, expenses) from a chunk reply's `Income:` / `Expenses:` lines, or None if either is missing."""
+    totals = []
+    for label in ("income", "expenses"):
+        match = re.search(rf"{label}\s*:\s*(?:rs\.?|inr|₹)?\s*([\d,]+(?:\.\d+)?)", str(content), re.I)
+        if not match:
+            return None
+        totals.append(safe_float(match.group(1).replace(",", "")))
+    return totals[0], totals[1]
+
+
+def _map_reduce_savings(text: str) -> float:
+    """Analyze chunks concurrently and add the per-chunk totals up in Python, not in the prompt."""
+    chunks = split_statement(text, ANALYZER_CHUNK_CHARS)
+    log.info("Map-reduce statement analysis", {"chunks": len(chunks), "chars": len(text)})
+
+    with ThreadPoolExecutor(max_workers=max(1, ANALYZER_CHUNK_WORKERS)) as pool:
+        results = list(pool.map(
+            lambda args: _analyze_chunk(*args),
+            [(chunk, i + 1, len(chunks)) for i, chunk in enumerate(chunks)]
+        ))
+
+    income = sum(r[0] for r in results)
+    expenses = sum(r[1] for r in results)
+    savings = max(0.0, income - expenses)
+    log.info("Map-reduce savings computed", {"income": income, "expenses": expenses, "savings": savings})
+    return savings
+
+
 def _extract_savings_from_response(content: str) -> float:
     """Extract and compute savings by parsing incomes and expenses."""
-    log.debug("Extracting savings from response", {"content": content[:200]})
+    log.debug("Extracting savings from response", lambda: {"content": content[:200]})
 
     # Patterns for amounts (e.g., Rs.50000, ₹50000, or 50000)
     amount_pattern = r"(?:Rs\.?|₹)?\s*([\d,]+)(?:\.\d+)?\b"
@@ -102,16 +229,27 @@ def transaction_analyzer_tools_node(state: State):
             tool_messages.append(ToolMessage(content=str(result), tool_call_id=call["id"]))
             log.debug("Tool executed", {"tool": call["name"], "success": True})
 
-            # Add the PDF content as a new message for LLM to analyze
-            state["messages"].append(AIMessage(content=f"PDF Content: {result}"))
-            llm_with_tools = llm_client.bind_tools([], tool_choice="none")  # No more tools needed
-            response = llm_with_tools.invoke(state["messages"])
-            state["messages"].append(response)
+            parsed = _parse_savings_fast_path(result)
+            if parsed:
+                # Statement parsed deterministically — no need to ask the LLM
+                total_savings = parsed.savings
+                tool_messages.append(AIMessage(content=f"Total savings: {total_savings}"))
+            elif _use_map_reduce(result):
+                total_savings = _map_reduce_savings(result)
+                tool_messages.append(AIMessage(content=f"Total savings: {total_savings}"))
+            else:
+                # Add the PDF content as a new message for LLM to analyze
+                state["messages"].append(AIMessage(content=f"PDF Content: {result}"))
+                llm_with_tools = get_llm_client().bind_tools([], tool_choice="none")  # No more tools needed
+                response = llm_with_tools.invoke(build_context(
+                    state["messages"], CONTEXT_TOKEN_BUDGETS["transaction_analyzer_tools"],
+                    node="transaction_analyzer_tools"
+                ))
+                state["messages"].append(response)
 
-            # Parse savings from the LLM's final response
-            total_savings = _extract_savings_from_response(response.content)
+                # Parse savings from the LLM's final response
+                total_savings = _extract_savings_from_response(response.content)
             state["total_savings"] = total_savings
-            state["formatted_savings"] = format_currency_inr(total_savings)
             log.info("Final savings extracted", {"total_savings": total_savings})
 
         except Exception as e:
@@ -119,10 +257,8 @@ def transaction_analyzer_tools_node(state: State):
             tool_messages.append(ToolMessage(content=error_msg, tool_call_id=call["id"]))
             log.error("Tool execution failed", {"tool": call["name"], "error": str(e)})
             state["total_savings"] = 0.0
-            state["formatted_savings"] = format_currency_inr(0.0)
 
     return {
         "messages": tool_messages,
-        "total_savings": state.get("total_savings", 0.0),
-        "formatted_savings": state.get("formatted_savings", format_currency_inr(0.0))
+        "total_savings": state.get("total_savings", 0.0)
     }
\ No newline at end of file
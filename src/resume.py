@@ -0,0 +1,73 @@
+# -------------------------------
+# RESUME
+# -------------------------------
+# Restarts a checkpointed run from its last completed node.
+#
+#   python -m src.resume <thread_id>
+#   python -m src.resume --list
+import argparse
+
+from src.graph.checkpointing import sqlite_checkpointer, run_config
+from src.graph.graph_creation import create_agent
+from src.helpers.confirmation import pending_confirmation
+from src.helpers.pretty_print import banner, info, success, warning
+from src.logger import log
+
+
+def list_thread_ids(checkpointer) -> list:
+    """Every thread id that has at least one checkpoint, most recent first."""
+    thread_ids = []
+    for checkpoint in checkpointer.list(None):
+        thread_id = checkpoint.config["configurable"]["thread_id"]
+        if thread_id not in thread_ids:
+            thread_ids.append(thread_id)
+    return thread_ids
+
+
+def resume_run(agent, thread_id: str):
+    """Continue a thread from its last checkpoint. Returns the final state, or None if there is nothing to do."""
+    config = run_config(thread_id)
+    snapshot = agent.get_state(config)
+    if not snapshot.values:
+        warning(f"No checkpoint found for run {thread_id}")
+        return None
+    if not snapshot.next:
+        info(f"Run {thread_id} already completed")
+        return snapshot.values
+    if pending_confirmation(agent, thread_id):
+        info(f"Run {thread_id} is waiting for confirmation: python -m src.confirm {thread_id} approve|reject")
+        return snapshot.values
+
+    log.info("Resuming run", {"thread_id": thread_id, "next": list(snapshot.next)})
+    info(f"Resuming run {thread_id} at: {', '.join(snapshot.next)}")
+    return agent.invoke(None, config)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume a checkpointed Monthly Stock Picker run")
+    parser.add_argument("thread_id", nargs="?", help="Run / thread id printed when the run started")
+    parser.add_argument("--list", action="store_true", help="List checkpointed runs and where they stopped")
+    args = parser.parse_args(argv)
+
+    with sqlite_checkpointer() as checkpointer:
+        agent = create_agent(checkpointer=checkpointer)
+
+        if args.list or not args.thread_id:
+            for thread_id in list_thread_ids(checkpointer):
+                snapshot = agent.get_state(run_config(thread_id))
+                if not snapshot.next:
+                    status = "completed"
+                elif pending_confirmation(agent, thread_id):
+                    status = "awaiting confirmation"
+                else:
+                    status = f"next: {', '.join(snapshot.next)}"
+                print(f"{thread_id:<40} {status}")
+            return
+
+        banner(f"RESUMING RUN {args.thread_id}", "=", 70)
+        if resume_run(agent, args.thread_id) is not None:
+            success("Run finished")
+
+
+if __name__ == "__main__":
+    main()
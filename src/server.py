@@ -0,0 +1,294 @@
+# -------------------------------
+# SERVICE
+# -------------------------------
+# Long-running HTTP mode: the graph is compiled once, the LLM client, tool registry
+# and prompts are loaded at start-up, and runs share a bounded worker pool.
+#
+#   python -m src.server --port 8080 --workers 8
+#
+#   POST /runs                       {"pdf_path": "...", "user_age": 35, "insured": false, "thread_id": "optional"}
+#   POST /runs/<thread_id>/confirm   {"decision": "approve" | "reject"}
+#   GET  /runs/<thread_id>           state summary of a checkpointed run
+#   GET  /health
+#   GET  /metrics                    Prometheus text format
+#
+# POST responses are server-sent events, one per completed node:
+#   run, node, interrupt, done, error
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from langgraph.types import Command
+
+from src.config import (get_llm_client, SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, SERVICE_MAX_QUEUE,
+                        STATEMENTS_ROOT)
+from src.graph.checkpointing import sqlite_checkpointer, run_config
+from src.graph.graph_creation import create_agent
+from src.helpers.confirmation import pending_confirmation
+from src.helpers.initial_state import build_initial_state
+from src.helpers.load_prompt import load_prompt
+from src.helpers.pretty_print import banner
+from src.logger import log
+from src.market.market_data_store import get_market_store
+from src.metrics import metrics
+from src.tools.tools_registry import create_tool_registry
+
+_DONE = object()
+
+
+class RunConflict(Exception):
+    """The thread id is already running, or its checkpoint does not allow the request."""
+
+
+def resolve_statement_path(pdf_path: str, root: str = STATEMENTS_ROOT) -> Optional[str]:
+    """Real path of a requested statement, or None when it resolves outside `root`."""
+    root = os.path.realpath(root)
+    path = os.path.realpath(pdf_path)
+    return path if os.path.commonpath([root, path]) == root else None
+
+
+def _state_summary(values: dict) -> dict:
+    """JSON-safe subset of the state sent to clients (messages stay in the checkpoint)."""
+    portfolio = values.get("portfolio")
+    return {
+        "total_savings": values.get("total_savings"),
+        "portfolio": portfolio.as_dict() if portfolio else None,
+        "projection": (values.get("projection") or {}).get("final"),
+        "investment_instruments": values.get("investment_instruments"),
+        "investment_execution": values.get("investment_execution")
+    }
+
+
+def warm_up():
+    """Load everything a run needs once, so the first request pays no start-up cost."""
+    get_llm_client()
+    create_tool_registry()
+    get_market_store()
+    prompts_dir = os.path.join(os.path.dirname(__file__), "prompts")
+    for file_name in os.listdir(prompts_dir):
+        load_prompt(file_name)
+
+
+class GraphService:
+    """Runs graph streams on a fixed pool; at most workers + max_queue runs are accepted at once."""
+
+    def __init__(self, agent, workers: int = SERVICE_WORKERS, max_queue: int = SERVICE_MAX_QUEUE):
+        self.agent = agent
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="graph-run")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        # Thread ids with a run in flight; reserved before streaming so concurrent requests can't share one
+        self._active = set()
+        self._active_lock = threading.Lock()
+
+    def submit(self, graph_input, thread_id: str,
+               check: Optional[Callable[[], Optional[str]]] = None) -> Optional[queue.Queue]:
+        """Start a run and return its event queue, or None when the service is saturated.
+
+        `check` returns an error message when the thread's checkpoint rules the request out; it
+        runs while the thread id is being reserved, so two requests can't both pass it.
+        Raises RunConflict for a thread that is already running or fails the check.
+        """
+        with self._active_lock:
+            if thread_id in self._active:
+                raise RunConflict(f"Run {thread_id} is already in progress")
+            error = check() if check else None
+            if error:
+                raise RunConflict(error)
+            if not self._slots.acquire(blocking=False):
+                return None
+            self._active.add(thread_id)
+        events = queue.Queue()
+        events.put(("run", {"thread_id": thread_id}))
+        self._pool.submit(self._run, graph_input, thread_id, events)
+        return events
+
+    def _run(self, graph_input, thread_id: str, events: queue.Queue):
+        config = run_config(thread_id)
+        start = time.perf_counter()
+        try:
+            for update in self.agent.stream(graph_input, config, stream_mode="updates"):
+                elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+                for node, payload in update.items():
+                    if node == "__interrupt__":
+                        for pending in payload:
+                            events.put(("interrupt", {"elapsed_ms": elapsed_ms, **pending.value}))
+                    else:
+                        events.put(("node", {"node": node, "elapsed_ms": elapsed_ms,
+                                             **_state_summary(payload or {})}))
+
+            values = self.agent.get_state(config).values
+            events.put(("done", {"thread_id": thread_id,
+                                 "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+                                 **_state_summary(values)}))
+        except Exception as e:
+            log.error("Service run failed", {"thread_id": thread_id, "error": str(e)})
+            events.put(("error", {"thread_id": thread_id, "error": str(e)}))
+        finally:
+            with self._active_lock:
+                self._active.discard(thread_id)
+            events.put(_DONE)
+            self._slots.release()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    service: GraphService = None
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _stream(self, events: Optional[queue.Queue]):
+        if events is None:
+            self._send_json(503, {"error": "Service busy, retry later"}, {"Retry-After": "5"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        while (event := events.get()) is not _DONE:
+            name, payload = event
+            try:
+                self.wfile.write(f"event: {name}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
+                                 .encode("utf-8"))
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # The run keeps going and is checkpointed; the client can poll GET /runs/<id>
+                log.warning("Client disconnected from stream")
+                return
+
+    def _submit_and_stream(self, graph_input, thread_id: str, check: Callable[[], Optional[str]]):
+        try:
+            events = self.service.submit(graph_input, thread_id, check)
+        except RunConflict as e:
+            self._send_json(409, {"error": str(e)})
+            return
+        if events is not None:
+            log.info("Service run accepted", {"thread_id": thread_id})
+        self._stream(events)
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("/") if p]
+        if parts == ["health"]:
+            self._send_json(200, {"status": "ok", "workers": self.service.workers})
+        elif parts == ["metrics"]:
+            data = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif len(parts) == 2 and parts[0] == "runs":
+            snapshot = self.service.agent.get_state(run_config(parts[1]))
+            if not snapshot.values:
+                self._send_json(404, {"error": f"Unknown run {parts[1]}"})
+                return
+            self._send_json(200, {
+                "thread_id": parts[1],
+                "next": list(snapshot.next),
+                "pending_confirmation": pending_confirmation(self.service.agent, parts[1]),
+                **_state_summary(snapshot.values)
+            })
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        parts = [p for p in self.path.split("/") if p]
+        try:
+            body = self._read_json()
+        except ValueError:
+            self._send_json(400, {"error": "Body must be JSON"})
+            return
+
+        if parts == ["runs"]:
+            if not body.get("pdf_path"):
+                self._send_json(400, {"error": "pdf_path is required"})
+                return
+            pdf_path = resolve_statement_path(str(body["pdf_path"]))
+            if pdf_path is None:
+                log.warning("Statement path outside the statements root", {"pdf_path": body["pdf_path"]})
+                self._send_json(403, {"error": "pdf_path must be inside the statements directory"})
+                return
+            thread_id = str(body.get("thread_id") or str(uuid.uuid4())[:8])
+            initial_state = build_initial_state(
+                pdf_path,
+                user_age=int(body.get("user_age", 35)),
+                insured=bool(body.get("insured", False)),
+                run_id=thread_id
+            )
+
+            def check():
+                if self.service.agent.get_state(run_config(thread_id)).values:
+                    return f"Run {thread_id} already exists"
+
+            self._submit_and_stream(initial_state, thread_id, check)
+
+        elif len(parts) == 3 and parts[0] == "runs" and parts[2] == "confirm":
+            thread_id = parts[1]
+            if body.get("decision") not in ("approve", "reject"):
+                self._send_json(400, {"error": "decision must be 'approve' or 'reject'"})
+                return
+
+            def check():
+                if not pending_confirmation(self.service.agent, thread_id):
+                    return f"Run {thread_id} is not waiting for confirmation"
+
+            log.info("Confirmation received", {"thread_id": thread_id, "decision": body["decision"]})
+            self._submit_and_stream(Command(resume=body["decision"]), thread_id, check)
+
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def log_message(self, format, *args):
+        log.debug("HTTP request", {"client": self.client_address[0], "request": format % args})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Monthly Stock Picker runs over HTTP")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Graph runs executing at once")
+    parser.add_argument("--max-queue", type=int, default=SERVICE_MAX_QUEUE, help="Accepted runs waiting for a worker")
+    args = parser.parse_args(argv)
+
+    warm_up()
+    with sqlite_checkpointer() as checkpointer:
+        service = GraphService(create_agent(checkpointer=checkpointer), max(1, args.workers), max(0, args.max_queue))
+        ServiceHandler.service = service
+        server = ThreadingHTTPServer((args.host, args.port), ServiceHandler)
+        server.daemon_threads = True
+
+        banner(f"SERVING ON http://{args.host}:{args.port}", "=", 70)
+        log.info("Service started", {"host": args.host, "port": args.port, "workers": args.workers})
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# -------------------------------
+# PDF Text Cache
+# -------------------------------
+# Content-addressed on-disk cache for extracted PDF text.
+# Keys are sha256(file bytes + extractor version), so renamed or duplicate
+# uploads of the same statement share one entry and extractor upgrades
+# never serve stale text.
+#
+# The total size is tracked as entries are written (seeded by one scan on first use),
+# so a put() only walks the directory when the cache is actually over budget, and
+# then evicts down to EVICT_TO of the budget so the next scans are far apart.
+import hashlib
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+from src.logger import log
+
+# Fraction of max_bytes an eviction pass trims the cache down to
+EVICT_TO = 0.9
+
+
+class PdfTextCache:
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Running totals, seeded on the first put() / stats() so creating the cache touches no
+        # files; other processes sharing the directory are picked up at the next scan
+        self._size: Optional[int] = None
+        self._entries = 0
+
+    def key_for(self, pdf_path: str, version: str) -> str:
+        digest = hashlib.sha256(version.encode("utf-8"))
+        with open(pdf_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        f = self.reader(key)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def reader(self, key: str) -> Optional[TextIO]:
+        """The open entry, for reading in pieces (the caller closes it), or None on a miss."""
+        path = self._path(key)
+        try:
+            f = open(path, encoding="utf-8")
+            os.utime(path)  # mtime doubles as the LRU timestamp
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return f
+
+    def put(self, key: str, text: str):
+        with self.writer(key) as f:
+            f.write(text)
+
+    @contextmanager
+    def writer(self, key: str) -> Iterator[TextIO]:
+        """Write an entry piece by piece (e.g. page by page) without holding it in memory.
+        The entry appears only if the block completes; on an error or early exit it is discarded."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._seed_totals()  # before this entry lands, so it is not counted twice
+        # Write-then-rename so concurrent readers (or processes) never see a partial file
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                yield f
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = None
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        with self._lock:
+            self._size += path.stat().st_size - (replaced or 0)
+            self._entries += replaced is None
+            over = self._size > self.max_bytes
+        if over:
+            self._evict()
+
+    def _seed_totals(self):
+        """Caller holds self._lock."""
+        if self._size is None:
+            entries = list(self._scan())
+            self._size = sum(size for _, size, _ in entries)
+            self._entries = len(entries)
+
+    def _scan(self):
+        """(mtime, size, path) of every cached entry."""
+        for path in self.cache_dir.glob("*/*.txt"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+    def _evict(self):
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO
+        count = len(entries)
+
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            total -= size
+            count -= 1
+            with self._lock:
+                self.evictions += 1
+
+        with self._lock:
+            self._size, self._entries = total, count
+        log.debug("PDF cache evicted entries", {"evictions": self.evictions, "size_bytes": total, "entries": count})
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._seed_totals()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": self._entries,
+                "size_bytes": self._size,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
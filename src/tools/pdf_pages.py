@@ -0,0 +1,83 @@
+# -------------------------------
+# PDF Page Extraction
+# -------------------------------
+# Page-streaming extraction used by pdf_reader_tool. Kept free of project
+# imports so process-pool workers start quickly (they only need PyPDF2).
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional, Tuple
+
+import PyPDF2
+
+PageRange = Optional[Tuple[int, Optional[int]]]
+
+
+def _resolve_range(page_count: int, page_range: PageRange) -> Tuple[int, int]:
+    """Clamp a 0-based, half-open (start, stop) range to the document."""
+    if page_range is None:
+        return 0, page_count
+    start, stop = page_range
+    start = max(0, start or 0)
+    stop = page_count if stop is None else min(stop, page_count)
+    return start, max(start, stop)
+
+
+def count_pages(pdf_path: str) -> int:
+    with open(pdf_path, "rb") as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def iter_pdf_pages(pdf_path: str, page_range: PageRange = None) -> Iterator[str]:
+    """Yield the text of each page in order, decoding one page at a time."""
+    with open(pdf_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        start, stop = _resolve_range(len(reader.pages), page_range)
+        for index in range(start, stop):
+            yield reader.pages[index].extract_text() or ""
+
+
+def _extract_page_range(args: Tuple[str, int, int]) -> str:
+    pdf_path, start, stop = args
+    return "".join(iter_pdf_pages(pdf_path, (start, stop)))
+
+
+def iter_pdf_text(pdf_path: str, page_range: PageRange = None, workers: int = 1,
+                  pages_per_task: int = 16, min_parallel_pages: int = 64) -> Iterator[str]:
+    """Yield the document text in page order, fanning page ranges out to a process pool.
+
+    Small documents (or workers <= 1) are decoded page by page in-process. Large ones are
+    split into `pages_per_task` ranges with at most 2 * workers ranges in flight, so the
+    caller can consume early pages while later ones are still decoding and memory stays
+    bounded to a few ranges.
+    """
+    if workers <= 1:
+        yield from iter_pdf_pages(pdf_path, page_range)
+        return
+
+    start, stop = _resolve_range(count_pages(pdf_path), page_range)
+    if stop - start < min_parallel_pages:
+        yield from iter_pdf_pages(pdf_path, (start, stop))
+        return
+
+    tasks = [(pdf_path, s, min(s + pages_per_task, stop)) for s in range(start, stop, pages_per_task)]
+    # spawn: forking a threaded process (batch runner, service) can deadlock
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque()
+        task_iter = iter(tasks)
+        for task in task_iter:
+            pending.append(pool.submit(_extract_page_range, task))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            text = pending.popleft().result()
+            next_task = next(task_iter, None)
+            if next_task is not None:
+                pending.append(pool.submit(_extract_page_range, next_task))
+            yield text
+
+
+def extract_pdf_text(pdf_path: str, page_range: PageRange = None, workers: int = 1) -> str:
+    """Full (or ranged) document text assembled with a single join."""
+    return "".join(iter_pdf_text(pdf_path, page_range, workers=workers))
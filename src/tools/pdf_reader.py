@@ -4,24 +4,57 @@
 import os
 
 from langchain_core.tools import tool
-from typing import Union
+from typing import Iterator, Union, Optional
 import PyPDF2
 
+from src.config import PDF_CACHE_DIR, PDF_CACHE_MAX_MB, PDF_EXTRACT_WORKERS, PDF_PARALLEL_MIN_PAGES
+from src.metrics import metrics, cache_gauges
+from src.tools.pdf_cache import PdfTextCache
+from src.tools.pdf_pages import iter_pdf_text
+
+# Bump when the extraction logic changes so cached text is not reused
+EXTRACTOR_VERSION = f"pypdf2-{PyPDF2.__version__}-1"
+
+# Piece size when replaying a cached statement (roughly a few pages of text)
+CACHED_READ_CHARS = 64 * 1024
+pdf_text_cache = PdfTextCache(PDF_CACHE_DIR, int(PDF_CACHE_MAX_MB * 1024 * 1024))
+metrics.register_collector(lambda: cache_gauges("pdf_text", pdf_text_cache.stats()))
+
+
+def iter_statement_text(pdf_path: str, page_range=None) -> Iterator[str]:
+    """Yield the text page by page as it is extracted (in CACHED_READ_CHARS pieces on a cache hit), so callers
+    can start parsing before the last page is decoded. Pages are written to the cache as they
+    pass, so only the pages in flight are held in memory."""
+    cache_key = pdf_text_cache.key_for(pdf_path, f"{EXTRACTOR_VERSION}:{page_range}")
+    cached = pdf_text_cache.reader(cache_key)
+    if cached is not None:
+        print(f"✅ Loaded cached PDF content for: {pdf_path}")
+        with cached:
+            yield from iter(lambda: cached.read(CACHED_READ_CHARS), "")
+        return
+
+    with pdf_text_cache.writer(cache_key) as cache_file:
+        for page in iter_pdf_text(pdf_path, page_range, workers=PDF_EXTRACT_WORKERS,
+                                  min_parallel_pages=PDF_PARALLEL_MIN_PAGES):
+            cache_file.write(page)
+            yield page
+    print(f"✅ Extracted PDF content from: {pdf_path}")
+
+
 @tool
-def pdf_reader_tool(pdf_path: str) -> Union[str, bool]:
-    """Read a PDF file and return its extracted text."""
+@metrics.timed("tool_duration_seconds", tool="pdf_reader_tool")
+def pdf_reader_tool(pdf_path: str, start_page: Optional[int] = None,
+                    end_page: Optional[int] = None) -> Union[str, bool]:
+    """Read a PDF file and return its extracted text. Optionally limit to pages start_page..end_page (1-based, inclusive)."""
     print(f"Reading {pdf_path}")
     if not os.path.exists(pdf_path):
         print(f"❌ File does not exist: {pdf_path}")
         return False
     try:
-        text = ""
-        with open(pdf_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                text += page.extract_text() or ""
-        print(f"✅ Extracted PDF content from: {pdf_path}")
-        return text
+        page_range = None
+        if start_page is not None or end_page is not None:
+            page_range = ((start_page or 1) - 1, end_page)
+        return "".join(iter_statement_text(pdf_path, page_range))
     except Exception as e:
         print(f"Error reading PDF {pdf_path}: {str(e)}")
         return False
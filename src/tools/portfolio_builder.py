@@ -1,36 +1,53 @@
 # -------------------------------
 # Portfolio Builder
 # -------------------------------
+from typing import Sequence, Union
+import numpy as np
 from langchain_core.tools import tool
 
-@tool
-def portfolio_builder_tool(total_savings: float, user_age: int, insured: bool) -> dict:
-    """Build an investment portfolio using the '100 - age' rule and adjust for insurance."""
-    if total_savings <= 0:
-        return {"error": "No savings to invest."}
+from src.metrics import metrics
+
+# Column order of the allocation table returned by build_portfolios
+# (matches the fields of entity.portfolio_allocation.PortfolioAllocation)
+ALLOCATION_COLUMNS = ("equity", "bonds", "emergency_fund", "insurance")
+EMERGENCY_FUND_RATIO = 0.1
+INSURANCE_RATIO = 0.1
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
 
-    # Apply the 100 - age rule for equity allocation
-    equity_ratio = max(0, min(100 - user_age, 100)) / 100
-    bond_ratio = 1 - equity_ratio
 
-    # Set aside emergency fund (e.g., 10%)
-    emergency_fund_ratio = 0.1
-    investable_ratio = 1 - emergency_fund_ratio
+def build_portfolios(total_savings: ArrayLike, user_ages: ArrayLike, insured: ArrayLike) -> np.ndarray:
+    """Allocate any number of users in one NumPy pass using the '100 - age' rule.
 
-    equity_ratio *= investable_ratio
-    bond_ratio *= investable_ratio
+    Returns a (n_users, 4) float64 table of rupee amounts in ALLOCATION_COLUMNS order.
+    Uninsured users get a 10% insurance slice and the table is rebalanced to 100%;
+    insured users get 0 in the insurance column. Non-positive savings give a zero row.
+    """
+    savings, ages, is_insured = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(total_savings, dtype=np.float64)),
+        np.atleast_1d(np.asarray(user_ages, dtype=np.float64)),
+        np.atleast_1d(np.asarray(insured, dtype=bool))
+    )
 
-    portfolio = {
-        "Equity (Stocks)": equity_ratio,
-        "Bond Securities": bond_ratio,
-        "Emergency Fund": emergency_fund_ratio
-    }
+    investable_ratio = 1 - EMERGENCY_FUND_RATIO
+    table = np.empty((savings.shape[0], len(ALLOCATION_COLUMNS)), dtype=np.float64)
+    equity_ratio = np.clip(100 - ages, 0, 100) / 100
+    table[:, 0] = equity_ratio * investable_ratio
+    table[:, 1] = (1 - equity_ratio) * investable_ratio
+    table[:, 2] = EMERGENCY_FUND_RATIO
+    table[:, 3] = np.where(is_insured, 0.0, INSURANCE_RATIO)
 
-    if not insured:
-        portfolio["Insurance"] = 0.1
-        # Rebalance to make sure total = 1.0
-        total = sum(portfolio.values())
-        portfolio = {k: v / total for k, v in portfolio.items()}
+    # Rebalance so each row sums to 1.0, then scale to rupees
+    table *= (np.maximum(savings, 0.0) / table.sum(axis=1))[:, None]
+    return table
+
+
+@tool
+@metrics.timed("tool_duration_seconds", tool="portfolio_builder_tool")
+def portfolio_builder_tool(total_savings: float, user_age: int, insured: bool) -> dict:
+    """Build an investment portfolio using the '100 - age' rule and adjust for insurance."""
+    if total_savings <= 0:
+        return {"error": "No savings to invest."}
 
-    formatted = {k: f"₹{(v * total_savings):,.2f}" for k, v in portfolio.items()}
-    return formatted
\ No newline at end of file
+    row = build_portfolios(total_savings, user_age, insured)[0]
+    return {name: round(float(amount), 2) for name, amount in zip(ALLOCATION_COLUMNS, row)}
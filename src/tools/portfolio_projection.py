@@ -0,0 +1,140 @@
+# -------------------------------
+# Portfolio Projection
+# -------------------------------
+# Monte Carlo projection of the monthly allocation: every month each asset class
+# receives its slice of total_savings and then grows by a correlated lognormal return.
+#
+# Wealth is linear in the contributions, so the simulation is run once per call for a
+# unit monthly contribution (and a unit starting balance) per asset class. Every
+# user's paths are then contributions @ unit_paths: a batch of users shares the same
+# random draws and costs one matrix product per user chunk. Seeded unit paths are
+# memoized, so repeated runs with the same settings skip the simulation entirely.
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+# Column order of the contribution table (PortfolioAllocation minus insurance, which is
+# a premium rather than an investment)
+PROJECTION_ASSETS = ("equity", "bonds", "emergency_fund")
+# Long-run nominal assumptions per asset class: annual expected return and volatility
+ANNUAL_RETURN = np.array([0.12, 0.07, 0.04])
+ANNUAL_VOLATILITY = np.array([0.18, 0.05, 0.005])
+CORRELATION = np.array([
+    [1.0, 0.1, 0.0],
+    [0.1, 1.0, 0.2],
+    [0.0, 0.2, 1.0],
+])
+PERCENTILES = (10, 50, 90)
+# Users projected per matrix product; bounds memory at USER_CHUNK x paths floats
+USER_CHUNK = 256
+# Seeded unit-path sets kept in memory (10,000 paths x 30 checkpoints is ~14 MB each)
+UNIT_PATHS_CACHE_SIZE = 2
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def simulate_unit_paths(months: int, paths: int, seed: Optional[int] = None,
+                        checkpoint_every: int = 12) -> Dict[str, np.ndarray]:
+    """Growth of one rupee contributed every month, and of one rupee held from the start.
+
+    Returns {"months": (n_ck,), "contrib": (paths, n_ck, 3), "hold": (paths, n_ck, 3)} with a
+    checkpoint every `checkpoint_every` months and at the horizon.
+    """
+    rng = np.random.default_rng(seed)
+    sigma = (ANNUAL_VOLATILITY / np.sqrt(12)).astype(np.float32)
+    mu = (np.log1p(ANNUAL_RETURN) / 12 - ANNUAL_VOLATILITY ** 2 / 24).astype(np.float32)
+    chol = np.linalg.cholesky(CORRELATION).T.astype(np.float32)
+    n_assets = len(PROJECTION_ASSETS)
+    half = (paths + 1) // 2
+
+    contrib = np.zeros((paths, n_assets))
+    hold = np.ones((paths, n_assets))
+    marks, contrib_ck, hold_ck = [], [], []
+    done = 0
+    while done < months:
+        block = min(checkpoint_every, months - done)
+        # Drawing the normals dominates the cost: draw float32, and only for half the paths;
+        # the other half reuses them negated (antithetic variates, which also cut variance)
+        shock = rng.standard_normal((block * half, n_assets), dtype=np.float32) @ chol
+        shock *= sigma
+        up = np.exp(mu + shock)
+        down = np.exp(mu - shock)
+        growth = np.concatenate([up.reshape(block, half, n_assets), down.reshape(block, half, n_assets)],
+                                axis=1)[:, :paths]
+        for g in growth:
+            contrib += 1.0
+            contrib *= g
+            hold *= g
+        done += block
+        marks.append(done)
+        contrib_ck.append(contrib.copy())
+        hold_ck.append(hold.copy())
+
+    return {"months": np.array(marks), "contrib": np.stack(contrib_ck, axis=1), "hold": np.stack(hold_ck, axis=1)}
+
+
+@lru_cache(maxsize=UNIT_PATHS_CACHE_SIZE)
+def _seeded_unit_paths(months: int, paths: int, seed: int, checkpoint_every: int) -> Dict[str, np.ndarray]:
+    unit = simulate_unit_paths(months, paths, seed, checkpoint_every)
+    for array in unit.values():
+        array.flags.writeable = False  # shared by every later call
+    return unit
+
+
+def project_portfolios(contributions: ArrayLike, months: int = 360, paths: int = 10_000,
+                       seed: Optional[int] = None, initial: Optional[ArrayLike] = None,
+                       percentiles: Sequence[float] = PERCENTILES, checkpoint_every: int = 12) -> Dict[str, np.ndarray]:
+    """Percentile outcomes for any number of users in one simulation.
+
+    contributions / initial are (3,) or (n_users, 3) rupees per month / at the start, in
+    PROJECTION_ASSETS order. Returns:
+      months       (n_ck,)               checkpoint month numbers
+      total        (n_users, n_ck, q)    total wealth percentiles at each checkpoint
+      final        (n_users, 3, q)       per-asset wealth percentiles at the horizon
+      contributed  (n_users, n_ck)       rupees put in by each checkpoint
+    """
+    c = np.atleast_2d(np.asarray(contributions, dtype=np.float64))
+    start = np.zeros_like(c) if initial is None else np.broadcast_to(
+        np.atleast_2d(np.asarray(initial, dtype=np.float64)), c.shape)
+    unit = (simulate_unit_paths(months, paths, None, checkpoint_every) if seed is None
+            else _seeded_unit_paths(months, paths, seed, checkpoint_every))
+    q = np.asarray(percentiles, dtype=np.float64)
+    n_users, n_ck = c.shape[0], unit["months"].shape[0]
+
+    total = np.empty((n_users, n_ck, q.size))
+    final = np.empty((n_users, c.shape[1], q.size))
+    for lo in range(0, n_users, USER_CHUNK):
+        hi = min(lo + USER_CHUNK, n_users)
+        for k in range(n_ck):
+            # (users, paths): every user's wealth on the shared paths
+            wealth = c[lo:hi] @ unit["contrib"][:, k].T + start[lo:hi] @ unit["hold"][:, k].T
+            total[lo:hi, k] = np.percentile(wealth, q, axis=1).T
+        for a in range(c.shape[1]):
+            asset = np.outer(c[lo:hi, a], unit["contrib"][:, -1, a]) + np.outer(start[lo:hi, a], unit["hold"][:, -1, a])
+            final[lo:hi, a] = np.percentile(asset, q, axis=1).T
+
+    contributed = start.sum(axis=1)[:, None] + c.sum(axis=1)[:, None] * unit["months"][None, :]
+    return {"months": unit["months"], "total": total, "final": final, "contributed": contributed}
+
+
+def projection_summary(contributions: Sequence[float], months: int, paths: int,
+                       seed: Optional[int] = None) -> dict:
+    """JSON-safe projection of one user's monthly allocation (yearly total-wealth percentiles)."""
+    result = project_portfolios(contributions, months, paths, seed)
+    labels = [f"p{int(p)}" for p in PERCENTILES]
+    return {
+        "months": months,
+        "paths": paths,
+        "monthly_contribution": round(float(np.sum(contributions)), 2),
+        "contributed": round(float(result["contributed"][0, -1]), 2),
+        "final": {
+            "total": dict(zip(labels, np.round(result["total"][0, -1], 2).tolist())),
+            **{asset: dict(zip(labels, np.round(result["final"][0, a], 2).tolist()))
+               for a, asset in enumerate(PROJECTION_ASSETS)}
+        },
+        "yearly_total": [
+            {"month": int(m), **dict(zip(labels, np.round(row, 2).tolist()))}
+            for m, row in zip(result["months"], result["total"][0])
+        ]
+    }
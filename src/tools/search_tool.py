@@ -1,32 +1,137 @@
 # -------------------------------
 # Search Tool
 # -------------------------------
-# import tavily
 from langchain_core.tools import tool
-from langchain_tavily import TavilySearch
-from dotenv import load_dotenv
-import os
-from langchain.tools import tool
-from langchain_tavily import TavilySearch
-import os
-load_dotenv()
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict
 
-# web_search_tool = TavilySearch(
-#     name="web_search_tool",
-#     max_results=3,
-#     search_depth="advanced",
-#     tavily_api_key=os.getenv("TAVILY_API_KEY")
-# )
+from src.config import TAVILY_API_KEY, SEARCH_CACHE_PATH, SEARCH_CACHE_TTL_S, SEARCH_CACHE_MAX_ENTRIES
+from src.helpers.provider_guard import tavily_guard
+from src.helpers.sqlite_cache import SQLiteCache
+from src.logger import log
+from src.metrics import metrics, cache_gauges
 
 
+SEARCH_MAX_RESULTS = 5
+SEARCH_DEPTH = "advanced"
+
+_tavily = None
+_search_cache = None
+_client_lock = threading.Lock()
+
+
+def get_tavily():
+    """Shared Tavily client, created on first search."""
+    global _tavily
+    if _tavily is None:
+        with _client_lock:
+            if _tavily is None:
+                from langchain_tavily import TavilySearch
+                _tavily = TavilySearch(
+                    max_results=SEARCH_MAX_RESULTS,
+                    search_depth=SEARCH_DEPTH,
+                    tavily_api_key=TAVILY_API_KEY
+                )
+    return _tavily
+
+
+def set_tavily_client(client):
+    """Install a replacement search backend (anything with .run(query)); None restores Tavily."""
+    global _tavily
+    with _client_lock:
+        _tavily = client
+
+
+def get_search_cache() -> SQLiteCache:
+    global _search_cache
+    if _search_cache is None:
+        with _client_lock:
+            if _search_cache is None:
+                _search_cache = SQLiteCache(
+                    SEARCH_CACHE_PATH, ttl_seconds=SEARCH_CACHE_TTL_S, max_entries=SEARCH_CACHE_MAX_ENTRIES
+                )
+    return _search_cache
+
+
+metrics.register_collector(lambda: cache_gauges("search", _search_cache.stats() if _search_cache else None))
+
+
+# Queries currently being fetched, so concurrent identical searches share one upstream call
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _search_key(query: str) -> str:
+    bucket = int(time.time() // SEARCH_CACHE_TTL_S)
+    normalized = " ".join(query.lower().split())
+    return f"{bucket}|{SEARCH_MAX_RESULTS}|{SEARCH_DEPTH}|{normalized}"
+
+
+class SearchError(RuntimeError):
+    """Raised when the search backend answers with an error payload instead of results."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        # "429 Too Many Requests" -> 429, so classify_error can tell retryable payloads apart
+        status = re.search(r"\b([45]\d\d)\b", message)
+        self.status_code = int(status.group(1)) if status else None
+
+
+def _check_result(result):
+    """Raise for a Tavily error payload ({"error": ...}) so it is never cached or shared."""
+    if isinstance(result, dict) and "error" in result:
+        error = result["error"]
+        raise error if isinstance(error, Exception) else SearchError(str(error))
+    return result
+
+
+def _run_search(query: str):
+    # Checked inside the guarded call: the guard only retries and trips on exceptions
+    return _check_result(get_tavily().run(query))
+
+
+def cached_search(query: str):
+    """Tavily search with a time-bucketed persistent cache and singleflight coalescing."""
+    key = _search_key(query)
+    cached = get_search_cache().get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            # A leader that finished since the first lookup has cached its result and left
+            # _inflight; re-check so this call does not start a second upstream search
+            cached = get_search_cache().get(key)
+            if cached is not None:
+                return json.loads(cached)
+            future = Future()
+            _inflight[key] = future
+
+    if not is_leader:
+        log.debug("Joined in-flight search", {"query": query})
+        return future.result()
+
+    try:
+        result = tavily_guard.call(_run_search, query)
+        get_search_cache().set(key, json.dumps(result, ensure_ascii=False, default=str))
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
 
-tavily = TavilySearch(
-    max_results=5,
-    search_depth="advanced",
-    tavily_api_key=os.getenv("TAVILY_API_KEY")
-)
 
 @tool
+@metrics.timed("tool_duration_seconds", tool="web_search_tool")
 def web_search_tool(query: str):
     """Search the web using Tavily."""
-    return tavily.run(query)
\ No newline at end of file
+    return cached_search(query)
\ No newline at end of file
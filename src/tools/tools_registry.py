@@ -1,6 +1,8 @@
 # -------------------------------
 # TOOL REGISTRY
 # -------------------------------
+from functools import lru_cache
+
 from src.tools.pdf_reader import pdf_reader_tool
 from src.tools.portfolio_builder import portfolio_builder_tool
 from src.tools.search_tool import web_search_tool
@@ -9,6 +11,8 @@ from src.tools.search_tool import web_search_tool
 def get_all_tools():
     return [pdf_reader_tool, portfolio_builder_tool, web_search_tool]
 
+@lru_cache(maxsize=1)
 def create_tool_registry():
+    """Name -> tool mapping, built once per process (treat as read-only)."""
     tools = get_all_tools()
     return {tool.name: tool for tool in tools}
\ No newline at end of file
@@ -1,22 +1,37 @@
 # src/utils.py
+import json
+import random
 import time
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, List, Optional, Tuple, Type
+from src.helpers.provider_guard import CircuitOpenError
 from src.logger import log
+from src.metrics import metrics
 
-def retry(max_attempts: int = 3, delay: float = 1.0):
+def retry(max_attempts: int = 3, delay: float = 1.0, retry_on: Tuple[Type[Exception], ...] = (Exception,)):
+    """Node-level retry with jittered exponential backoff.
+
+    Provider calls are already retried by their ProviderGuard; an open circuit is
+    raised straight away instead of being retried here as well. Pass `retry_on` to
+    retry only the caller's own failures (e.g. parse errors) and leave provider
+    errors to the guard.
+    """
     def decorator(func: Callable):
         @wraps(func)
         def wrapper(*args, **kwargs):
             for attempt in range(1, max_attempts + 1):
                 try:
                     return func(*args, **kwargs)
-                except Exception as e:
+                except CircuitOpenError:
+                    raise
+                except retry_on as e:
                     if attempt == max_attempts:
+                        metrics.inc("retry_failures_total", labels={"function": func.__name__})
                         log.error(f"Failed after {max_attempts} attempts", {"error": str(e)})
                         raise
+                    metrics.inc("retries_total", labels={"function": func.__name__})
                     log.warning(f"Retry {attempt}/{max_attempts}", {"error": str(e)})
-                    time.sleep(delay * (2 ** (attempt - 1)))  # Exponential backoff
+                    time.sleep(random.uniform(0, delay * (2 ** (attempt - 1))))  # Exponential backoff, full jitter
             return None
         return wrapper
     return decorator
@@ -31,10 +46,113 @@ def safe_float(value: Any, default: float = 0.0) -> float:
     except:
         return default
 
-def prune_messages(messages: list, max_messages: int = 20):
-    """Keep only system + last N messages"""
-    if len(messages) <= max_messages:
+def count_tokens(message) -> int:
+    """Approximate token count of one message (~4 characters per token + per-message overhead)."""
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        content += json.dumps([{"name": tc["name"], "args": tc["args"]} for tc in tool_calls], default=str)
+    return len(content) // 4 + 4
+
+
+def count_messages_tokens(messages: list) -> int:
+    return sum(count_tokens(m) for m in messages)
+
+
+def _is_tool_output(message) -> bool:
+    return message.type == "tool" or (
+        message.type == "ai" and isinstance(message.content, str) and message.content.startswith("PDF Content:")
+    )
+
+
+def _truncate(message, max_tokens: int, note: str):
+    content = str(message.content)
+    keep_chars = max(0, (max_tokens - 4) * 4 - len(note))
+    return message.model_copy(update={"content": content[:keep_chars] + note})
+
+
+def _group_units(messages: list) -> List[List[int]]:
+    """Group indices so an AI tool call always travels with the ToolMessages that answer it."""
+    units, i = [], 0
+    while i < len(messages):
+        unit = [i]
+        if getattr(messages[i], "tool_calls", None):
+            while i + 1 < len(messages) and messages[i + 1].type == "tool":
+                i += 1
+                unit.append(i)
+        units.append(unit)
+        i += 1
+    return units
+
+
+def build_context(messages: list, max_tokens: int, node: Optional[str] = None,
+                  stale_tool_tokens: int = 100) -> list:
+    """Fit a node's prompt into a token budget.
+
+    System messages, the latest human instruction and the newest exchange are always kept
+    (oversized newest tool output is cut to the room they leave). Tool output other than the
+    most recent one (e.g. an earlier PDF dump) is cut down to a short stub, and older
+    messages are dropped newest-first once the budget is spent.
+    """
+    if not messages:
         return messages
-    system_msg = next((m for m in messages if m.type == "system"), None)
-    recent = messages[-max_messages+1:]
-    return [system_msg] + recent if system_msg else recent
\ No newline at end of file
+
+    # 1. Summarize stale tool output
+    tool_indices = [i for i, m in enumerate(messages) if _is_tool_output(m)]
+    fitted = list(messages)
+    summarized = 0
+    for i in tool_indices[:-1]:
+        tokens = count_tokens(fitted[i])
+        if tokens > stale_tool_tokens:
+            fitted[i] = _truncate(fitted[i], stale_tool_tokens, f" ...[earlier tool output omitted, ~{tokens} tokens]")
+            summarized += 1
+
+    # 2. Pin system messages, the latest human instruction and the newest non-system unit
+    units = _group_units(fitted)
+    system_units = [u for u in units if fitted[u[0]].type == "system"]
+    other_units = [u for u in units if fitted[u[0]].type != "system"]
+    human_units = [u for u in other_units[:-1] if fitted[u[0]].type == "human"]
+    pinned = system_units + human_units[-1:] + other_units[-1:]
+    used = sum(count_tokens(fitted[i]) for u in pinned for i in u)
+
+    # The newest tool output alone may not fit — truncate it to what is left
+    if used > max_tokens and tool_indices and any(tool_indices[-1] in u for u in pinned):
+        i = tool_indices[-1]
+        overflow = used - max_tokens
+        allowed = max(stale_tool_tokens, count_tokens(fitted[i]) - overflow)
+        used -= count_tokens(fitted[i])
+        fitted[i] = _truncate(fitted[i], allowed, " ...[truncated to fit the context budget]")
+        used += count_tokens(fitted[i])
+
+    # 3. Fill the rest of the budget with the most recent units
+    kept = {i for u in pinned for i in u}
+    dropped = 0
+    for unit in reversed(other_units[:-1]):
+        if unit[0] in kept:
+            continue
+        unit_tokens = sum(count_tokens(fitted[i]) for i in unit)
+        if used + unit_tokens > max_tokens:
+            dropped += len(unit)
+            continue
+        kept.update(unit)
+        used += unit_tokens
+
+    # A ToolMessage is only valid right after its tool call; drop any orphan left behind
+    result = []
+    for i in sorted(kept):
+        if fitted[i].type == "tool" and (not result or not (
+                getattr(result[-1], "tool_calls", None) or result[-1].type == "tool")):
+            dropped += 1
+            continue
+        result.append(fitted[i])
+
+    if node:
+        log.info("Context built", {
+            "node": node,
+            "tokens": count_messages_tokens(result),
+            "budget": max_tokens,
+            "messages": len(result),
+            "dropped": dropped,
+            "summarized": summarized
+        })
+    return result
\ No newline at end of file